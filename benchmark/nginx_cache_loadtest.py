@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# nginx 캐시 계층 부하 테스트: 경로별 지연시간(p50/p99), 처리량, X-Cache-Status 적중률을 출력
+#
+#   python benchmark/nginx_cache_loadtest.py --base-url http://localhost \
+#       --path / --path /post/1 --path /download/<file_id> --requests 2000 --concurrency 32
+#
+# nginx 캐시를 끈 설정과 켠 설정에서 각각 실행해 결과를 비교한다.
+import argparse
+import collections
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.cache_status = collections.defaultdict(collections.Counter)
+        self.errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def record(self, path, latency, cache_status, error=None):
+        with self._lock:
+            self.latencies[path].append(latency)
+            self.cache_status[path][cache_status or '-'] += 1
+            if error:
+                self.errors[path] += 1
+
+
+def fetch(base_url, path, stats, timeout):
+    request = urllib.request.Request(base_url.rstrip('/') + path, headers={'Accept-Encoding': 'gzip'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            while response.read(64 * 1024):
+                pass
+            cache_status = response.headers.get('X-Cache-Status')
+        stats.record(path, time.perf_counter() - started, cache_status)
+    except urllib.error.HTTPError as e:
+        stats.record(path, time.perf_counter() - started, e.headers.get('X-Cache-Status'), error=str(e.code))
+    except Exception as e:
+        stats.record(path, time.perf_counter() - started, None, error=str(e))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='nginx cache load test')
+    parser.add_argument('--base-url', default='http://localhost')
+    parser.add_argument('--path', action='append', dest='paths', help='요청할 경로 (여러 번 지정 가능)')
+    parser.add_argument('--requests', type=int, default=1000, help='경로별 요청 수')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=10)
+    args = parser.parse_args()
+    paths = args.paths or ['/']
+
+    stats = Stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(args.requests):
+            for path in paths:
+                pool.submit(fetch, args.base_url, path, stats, args.timeout)
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(v) for v in stats.latencies.values())
+    print(f'total requests: {total}  elapsed: {elapsed:.2f}s  throughput: {total / elapsed:.1f} req/s')
+    print(f"{'path':40} {'p50(ms)':>9} {'p99(ms)':>9} {'mean(ms)':>9} {'hit%':>6} {'errors':>7}  cache")
+    for path in paths:
+        latencies = stats.latencies[path]
+        counter = stats.cache_status[path]
+        hits = counter['HIT'] + counter['STALE'] + counter['UPDATING']
+        hit_ratio = 100.0 * hits / max(1, sum(counter.values()))
+        print(
+            f'{path:40} {percentile(latencies, 50) * 1000:9.2f} {percentile(latencies, 99) * 1000:9.2f} '
+            f'{statistics.mean(latencies) * 1000 if latencies else 0:9.2f} {hit_ratio:6.1f} '
+            f'{stats.errors[path]:7d}  {dict(counter)}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# 벤치마크 시나리오: 가상 사용자(스레드)마다 쿠키 세션을 두고 요청 하나를 한 번의 측정으로 기록
+import http.cookiejar
+import json
+import os
+import random
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # 글 작성/로그인 후의 리다이렉트는 따라가지 않고 해당 요청만 측정
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class VirtualUser:
+    def __init__(self, frontend_url, post_service_url, data, timeout=30):
+        self.frontend_url = frontend_url
+        self.post_service_url = post_service_url
+        self.data = data
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), NoRedirect()
+        )
+        self.cursor = ''
+        self.logged_in = False
+
+    def request(self, url, data=None, headers=None):
+        # (HTTP 상태, 읽은 바이트 수) 반환. 3xx/4xx/5xx도 응답으로 취급
+        request = urllib.request.Request(url, data=data, headers=headers or {})
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                size = 0
+                while True:
+                    chunk = response.read(64 * 1024)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                return response.status, size
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code, 0
+
+    def login(self):
+        user = random.choice(self.data['users'])
+        body = urllib.parse.urlencode({'username': user['username'], 'password': user['password']}).encode()
+        status, size = self.request(f'{self.frontend_url}/login', data=body)
+        self.logged_in = status in (200, 302)
+        return status, size
+
+
+def browse(user):
+    # 비로그인 목록 앞쪽 페이지와 상세 페이지 조회
+    if random.random() < 0.7:
+        return user.request(f'{user.frontend_url}/?page={random.randint(1, 3)}')
+    post_id = random.randint(1, max(1, user.data['last_post_id']))
+    return user.request(f'{user.frontend_url}/post/{post_id}')
+
+
+def deep_offset(user):
+    # OFFSET 방식 깊은 페이지 (전체의 뒤쪽 절반)
+    pages = max(1, user.data['last_post_id'] // 10)
+    return user.request(f'{user.frontend_url}/?page={random.randint(max(1, pages // 2), pages)}')
+
+
+def deep_cursor(user):
+    # 커서 방식으로 목록을 계속 넘김 (post-service API 직접 호출)
+    query = urllib.parse.urlencode({'cursor': user.cursor, 'per_page': 10, 'fields': 'list'})
+    request = urllib.request.Request(f'{user.post_service_url}/posts?{query}')
+    try:
+        with urllib.request.urlopen(request, timeout=user.timeout) as response:
+            body = response.read()
+            user.cursor = json.loads(body).get('next_cursor') or ''
+            return response.status, len(body)
+    except urllib.error.HTTPError as e:
+        user.cursor = ''
+        return e.code, 0
+
+
+def author_feed(user):
+    # 작성자별 목록 첫 페이지 (frontend /users/<id>/posts)
+    author = random.choice(user.data['users'])
+    return user.request(f"{user.frontend_url}/users/{author['user_id']}/posts")
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            'Content-Type: text/plain\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def write(user):
+    # 로그인 사용자의 글 작성 (attachment_size > 0이면 첨부파일 포함)
+    # 로그인은 측정 전에 SETUP에서 하고, 실패한 경우에만 여기서 다시 시도한다
+    if not user.logged_in:
+        return user.login()
+    fields = {'title': f'부하 테스트 {uuid.uuid4().hex[:8]}', 'content': '벤치마크 본문 ' * 50}
+    size = user.data.get('attachment_size', 0)
+    files = {'file': ('bench.txt', os.urandom((size + 1) // 2).hex()[:size].encode())} if size else {}
+    body, content_type = multipart(fields, files)
+    return user.request(f'{user.frontend_url}/write', data=body, headers={'Content-Type': content_type})
+
+
+def download(user):
+    if not user.data['file_ids']:
+        return 0, 0
+    return user.request(f"{user.frontend_url}/download/{random.choice(user.data['file_ids'])}")
+
+
+# 측정 전에 가상 사용자마다 한 번 실행 (측정 시간/요청 수에 포함하지 않음)
+SETUP = {
+    'write': VirtualUser.login,
+}
+
+SCENARIOS = {
+    'browse': browse,
+    'deep_offset': deep_offset,
+    'deep_cursor': deep_cursor,
+    'author_feed': author_feed,
+    'write': write,
+    'download': download,
+}
@@ -0,0 +1,121 @@
+# 벤치마크 데이터 시드: 사용자/첨부파일은 API로, 대량 게시글은 post-service 앱 컨텍스트에서 일괄 삽입
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+SEED_POSTS = r'''
+import json
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app import app, db, Post, search_backend, post_count
+from author_counts import rebuild_author_counts
+
+count, batch_size = int(sys.argv[1]), int(sys.argv[2])
+authors = json.loads(sys.argv[3])
+file_ids = json.loads(sys.argv[4])
+words = ['게시판', '성능', '테스트', '캐시', '검색', 'board', 'latency', 'python', 'mysql', 's3']
+started = datetime.utcnow() - timedelta(seconds=count)
+
+with app.app_context():
+    for offset in range(0, count, batch_size):
+        posts = []
+        for i in range(offset, min(offset + batch_size, count)):
+            author = authors[i % len(authors)]
+            file_id = file_ids[i % len(file_ids)] if file_ids and i % 5 == 0 else None
+            posts.append(Post(
+                title=f'벤치마크 게시글 {i} ' + words[i % len(words)],
+                content=' '.join(words[(i + j) % len(words)] for j in range(60)),
+                author_id=author['user_id'],
+                author_name=author['username'],
+                file_id=file_id,
+                file_name=f'{file_id}.txt' if file_id else None,
+                created_at=started + timedelta(seconds=i)
+            ))
+        db.session.add_all(posts)
+        db.session.flush()
+        for post in posts:
+            search_backend.index_post(db.session, SimpleNamespace(id=post.id, title=post.title, content=post.content))
+        db.session.commit()
+    rebuild_author_counts(db.session)
+    post_count.invalidate()
+    print(db.session.query(Post.id).order_by(Post.id.desc()).limit(1).scalar() or 0)
+'''
+
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def seed_users(user_service_url, count, password='bench-password'):
+    users = []
+    for i in range(count):
+        username = f'bench{i}'
+        try:
+            post_json(f'{user_service_url}/register', {'username': username, 'password': password})
+        except urllib.error.HTTPError as e:
+            if e.code != 400:  # 이미 존재하는 사용자
+                raise
+        data = post_json(f'{user_service_url}/login', {'username': username, 'password': password})
+        users.append({'user_id': data['user_id'], 'username': username, 'password': password})
+    return users
+
+
+def text_body(size):
+    # .txt로 올리므로 내용 검사(NUL 바이트 없음)를 통과하는 텍스트, 파일마다 달라 중복 제거되지 않음
+    return os.urandom((size + 1) // 2).hex()[:size].encode()
+
+
+def wait_until_ready(file_service_url, file_ids, timeout=120):
+    # 단계적 업로드는 202로 먼저 응답하므로 다운로드 시나리오 전에 승격을 기다린다
+    deadline = time.monotonic() + timeout
+    remaining = list(file_ids)
+    while remaining:
+        file_id = remaining[0]
+        with urllib.request.urlopen(f'{file_service_url}/uploads/{file_id}', timeout=10) as response:
+            status = json.loads(response.read())['status']
+        if status == 'failed':
+            raise RuntimeError(f'seed file {file_id} failed processing')
+        if status == 'ready':
+            remaining.pop(0)
+            continue
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'{len(remaining)} seed files not processed in {timeout}s')
+        time.sleep(0.2)
+
+
+def seed_files(file_service_url, count, size):
+    file_ids = []
+    for i in range(count):
+        request = urllib.request.Request(
+            f'{file_service_url}/upload?filename=bench-{i}.txt', data=text_body(size),
+            headers={'Content-Type': 'text/plain'}
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            file_ids.append(json.loads(response.read())['file_id'])
+    wait_until_ready(file_service_url, file_ids)
+    return file_ids
+
+
+def seed_posts(stack, count, users, file_ids, batch_size=1000):
+    if count <= 0:
+        return 0
+    authors = [{'user_id': user['user_id'], 'username': user['username']} for user in users]
+    output = stack.run_in_service(
+        'post-service', SEED_POSTS, str(count), str(batch_size), json.dumps(authors), json.dumps(file_ids)
+    )
+    return int(output.strip().splitlines()[-1])
+
+
+def seed(stack, users=20, posts=10000, files=20, file_size=256 * 1024):
+    seeded_users = seed_users(stack.url('user-service'), users)
+    file_ids = seed_files(stack.url('file-service'), files, file_size)
+    last_post_id = seed_posts(stack, posts, seeded_users, file_ids)
+    return {'users': seeded_users, 'file_ids': file_ids, 'last_post_id': last_post_id}
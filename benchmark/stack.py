@@ -0,0 +1,167 @@
+# 벤치마크용 로컬 스택: 네 서비스를 gunicorn으로 띄우고 DB(SQLite/MySQL), S3(moto/MinIO)를 연결
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 서비스 이름 → 기본 포트 오프셋
+SERVICES = (
+    ('user-service', 1),
+    ('post-service', 2),
+    ('file-service', 3),
+    ('frontend', 0),
+)
+
+def wait_for(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status < 500:
+                    return
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url} did not become ready in {timeout}s')
+
+
+class Stack:
+    def __init__(self, base_port=15000, database_url=None, s3_endpoint=None, workers=2,
+                 threads=1, frontend_mode='sync', frontend_python=None, workdir=None, extra_env=None):
+        self.base_port = base_port
+        self.database_url = database_url
+        self.s3_endpoint = s3_endpoint
+        self.workers = workers
+        self.threads = threads
+        self.frontend_mode = frontend_mode
+        # async 모드(Quart)는 Flask 3이 필요해 다른 서비스와 가상환경을 분리해야 할 수 있다
+        self.frontend_python = frontend_python or sys.executable
+        self.workdir = workdir or tempfile.mkdtemp(prefix='board-bench-')
+        self.extra_env = dict(extra_env or {})
+        self.processes = {}
+        self._log_files = []
+
+    def port(self, name):
+        return self.base_port + dict(SERVICES)[name]
+
+    def url(self, name):
+        return f'http://127.0.0.1:{self.port(name)}'
+
+    @property
+    def s3_url(self):
+        return self.s3_endpoint or f'http://127.0.0.1:{self.base_port + 4}'
+
+    def database_for(self, name):
+        # SQLite는 서비스마다 파일을 따로 둔다 (MySQL이면 같은 DB를 공유)
+        if self.database_url:
+            return self.database_url
+        return f"sqlite:///{os.path.join(self.workdir, name.replace('-', '_'))}.db"
+
+    def base_env(self):
+        env = dict(os.environ)
+        env.update({
+            'SECRET_KEY': 'bench-secret',
+            'JWT_SECRET_KEY': 'bench-jwt-secret',
+            'USER_SERVICE_URL': self.url('user-service'),
+            'POST_SERVICE_URL': self.url('post-service'),
+            'FILE_SERVICE_URL': self.url('file-service'),
+            'INTERNAL_API_TOKEN': 'bench-internal-token',
+            'AUTH_INVALIDATION_URLS': f"{self.url('post-service')}/internal/auth/invalidate",
+            'AWS_ACCESS_KEY_ID': 'bench',
+            'AWS_SECRET_ACCESS_KEY': 'bench-secret',
+            'AWS_DEFAULT_REGION': 'us-east-1',
+            'S3_BUCKET_NAME': 'board-bench',
+            'S3_ENDPOINT_URL': self.s3_url,
+            'GUNICORN_THREADS': str(self.threads),
+            # 부하 발생기가 한 IP에서 로그인/가입하므로 시도 제한은 끈다
+            'LOGIN_RATE_PER_IP': '0',
+            'LOGIN_RATE_PER_USERNAME': '0',
+            'REGISTER_RATE_PER_IP': '0',
+            # 벤치마크는 SSE 알림을 측정하지 않으므로 Redis 없이 워커별 브로커로 띄운다
+            'EVENTS_ALLOW_LOCAL_MULTIWORKER': 'true',
+        })
+        env.update(self.extra_env)
+        return env
+
+    def _spawn(self, name, args, cwd, env):
+        log = open(os.path.join(self.workdir, f'{name}.log'), 'ab')
+        self._log_files.append(log)
+        self.processes[name] = subprocess.Popen(args, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    def start(self):
+        if not self.s3_endpoint:
+            self._spawn(
+                's3', [sys.executable, '-m', 'moto.server', '-H', '127.0.0.1', '-p', str(self.base_port + 4)],
+                cwd=self.workdir, env=self.base_env()
+            )
+            wait_for(self.s3_url)
+        self.create_bucket()
+
+        for name, _ in SERVICES:
+            cwd = os.path.join(ROOT, name)
+            env = self.base_env()
+            env['DATABASE_URL'] = self.database_for(name)
+            env['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(self.workdir, f'metrics-{name}')
+            os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+            # 테이블 생성은 각 서비스 gunicorn.conf.py의 on_starting 훅이 처리
+            python = self.frontend_python if name == 'frontend' else sys.executable
+            args = [
+                python, '-m', 'gunicorn',
+                '--bind', f'127.0.0.1:{self.port(name)}',
+                '--workers', str(self.workers),
+                '--threads', str(self.threads),
+            ]
+            if name == 'frontend' and self.frontend_mode == 'async':
+                args += ['--worker-class', 'uvicorn.workers.UvicornWorker', 'asgi:app']
+            else:
+                args += ['app:app']
+            self._spawn(name, args, cwd=cwd, env=env)
+
+        for name, _ in SERVICES:
+            wait_for(f'{self.url(name)}/health' if name != 'frontend' else self.url(name))
+        return self
+
+    def create_bucket(self):
+        import boto3
+        s3 = boto3.client(
+            's3', endpoint_url=self.s3_url, region_name='us-east-1',
+            aws_access_key_id='bench', aws_secret_access_key='bench-secret'
+        )
+        try:
+            s3.create_bucket(Bucket='board-bench')
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+    def run_in_service(self, name, code, *args):
+        # 서비스 디렉터리에서 앱 설정 그대로 스크립트 실행 (시드 등)
+        env = self.base_env()
+        env['DATABASE_URL'] = self.database_for(name)
+        return subprocess.run(
+            [sys.executable, '-c', code, *args], cwd=os.path.join(ROOT, name),
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+
+    def pids(self):
+        return {name: process.pid for name, process in self.processes.items() if name != 's3'}
+
+    def stop(self):
+        for process in self.processes.values():
+            process.terminate()
+        for process in self.processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for log in self._log_files:
+            log.close()
+        self.processes = {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
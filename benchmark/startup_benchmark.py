@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# gunicorn 기동 시간/메모리 벤치마크: 서비스별로 preload 켬/끔 상태에서 마스터를 띄워
+# 모든 워커가 준비될 때까지 걸린 시간과 프로세스 트리의 RSS/PSS/USS를 비교한다.
+#
+#   pip install -r benchmark/requirements.txt
+#   python benchmark/startup_benchmark.py --workers 4 --runs 3
+#   python benchmark/startup_benchmark.py --service post-service --env GUNICORN_WORKER_CLASS=sync
+#
+# RSS는 워커끼리 공유하는 페이지를 중복으로 세므로 copy-on-write 효과는 PSS/USS 합계로 본다 (Linux 전용).
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from stack import ROOT, SERVICES, Stack
+
+READY_LINE = b'Worker ready'
+
+# frontend는 업스트림 없이 응답하는 정적 파일로 확인
+PROBE_PATHS = {'frontend': '/static/css/base.css'}
+
+
+def probe(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status < 500
+    except Exception:
+        return False
+
+
+def memory_usage(psutil, pid):
+    root = psutil.Process(pid)
+    usage = {'rss': 0, 'pss': 0, 'uss': 0, 'processes': 0}
+    for process in [root] + root.children(recursive=True):
+        try:
+            info = process.memory_full_info()
+        except psutil.Error:
+            continue
+        usage['rss'] += info.rss
+        usage['pss'] += getattr(info, 'pss', 0)
+        usage['uss'] += info.uss
+        usage['processes'] += 1
+    return usage
+
+
+def measure(stack, name, workers, preload, timeout, settle):
+    import psutil
+
+    port = stack.port(name)
+    env = stack.base_env()
+    env.update({
+        'DATABASE_URL': stack.database_for(name),
+        'PROMETHEUS_MULTIPROC_DIR': os.path.join(stack.workdir, f'metrics-{name}'),
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_PRELOAD': '1' if preload else '0',
+    })
+    env.pop('GUNICORN_THREADS', None)  # 스레드 수는 서비스별 gunicorn.conf.py 기본값을 쓴다
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+    log_path = os.path.join(stack.workdir, f"{name}-{'preload' if preload else 'no-preload'}.log")
+    url = f"http://127.0.0.1:{port}{PROBE_PATHS.get(name, '/health')}"
+
+    with open(log_path, 'wb') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn'], cwd=os.path.join(ROOT, name),
+            env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        try:
+            first_response = None
+            ready = None
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if process.poll() is not None:
+                    raise RuntimeError(f'{name} exited with {process.returncode} (log: {log_path})')
+                if first_response is None and probe(url):
+                    first_response = time.perf_counter() - started
+                with open(log_path, 'rb') as f:
+                    booted = f.read().count(READY_LINE)
+                if first_response is not None and booted >= workers:
+                    ready = time.perf_counter() - started
+                    break
+                time.sleep(0.05)
+            if ready is None:
+                raise RuntimeError(f'{name} workers not ready in {timeout}s (log: {log_path})')
+
+            # 첫 요청 이후 지연 생성되는 객체까지 포함하도록 워커마다 몇 번씩 요청한 뒤 측정
+            for _ in range(workers * 4):
+                probe(url)
+            time.sleep(settle)
+            usage = memory_usage(psutil, process.pid)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    mb = 1024 * 1024
+    return {
+        'first_response_s': first_response,
+        'all_workers_ready_s': ready,
+        'processes': usage['processes'],
+        'rss_mb': usage['rss'] / mb,
+        'pss_mb': usage['pss'] / mb,
+        'uss_mb': usage['uss'] / mb,
+    }
+
+
+def summarize(runs):
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def print_report(result):
+    print(f"{'service':13} {'preload':>7} {'first(s)':>9} {'ready(s)':>9} {'procs':>6}"
+          f" {'rss(MB)':>9} {'pss(MB)':>9} {'uss(MB)':>9}")
+    for name, modes in result['services'].items():
+        for mode, stats in modes.items():
+            print(
+                f"{name:13} {mode:>7} {stats['first_response_s']:9.2f} {stats['all_workers_ready_s']:9.2f}"
+                f" {stats['processes']:6.0f} {stats['rss_mb']:9.1f} {stats['pss_mb']:9.1f} {stats['uss_mb']:9.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='gunicorn startup time / memory benchmark')
+    parser.add_argument('--service', action='append', dest='services', choices=[name for name, _ in SERVICES],
+                        help='측정할 서비스 (여러 번 지정 가능, 기본값: 전체)')
+    parser.add_argument('--database-url', help='MySQL 등 공유 DB URL (기본값: 서비스별 SQLite)')
+    parser.add_argument('--base-port', type=int, default=16000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=3, help='설정별 반복 횟수 (중앙값 사용)')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--settle', type=float, default=1.0, help='메모리 측정 전 대기 시간(초)')
+    parser.add_argument('--env', action='append', default=[], help='서비스에 넘길 환경 변수 KEY=VALUE')
+    parser.add_argument('--output', help='결과를 JSON으로 저장')
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('psutil') is None:
+        sys.exit('psutil is required: pip install -r benchmark/requirements.txt')
+
+    # 기동 측정에는 S3가 필요 없다 (클라이언트는 첫 요청 때 만들어진다)
+    stack = Stack(
+        base_port=args.base_port, database_url=args.database_url,
+        extra_env=dict(item.split('=', 1) for item in args.env)
+    )
+    result = {
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'services': {},
+    }
+    for name in args.services or [name for name, _ in SERVICES]:
+        result['services'][name] = {}
+        for preload in (False, True):
+            runs = [
+                measure(stack, name, args.workers, preload, args.timeout, args.settle)
+                for _ in range(args.runs)
+            ]
+            result['services'][name]['on' if preload else 'off'] = summarize(runs)
+            print(f'{name} preload={preload}: done', file=sys.stderr)
+
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,51 @@ CREATE TABLE IF NOT EXISTS posts (
     file_id VARCHAR(255),
     file_name VARCHAR(255),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    INDEX idx_author_id (author_id),
-    INDEX idx_created_at (created_at)
+    INDEX idx_author_created_at_id (author_id, created_at, id),
+    INDEX idx_created_at_id (created_at, id),
+    INDEX idx_file_id (file_id),
+    FULLTEXT INDEX ft_title_content (title, content) WITH PARSER ngram
+);
+
+-- Author post counts (updated with each post insert/delete instead of COUNT(*))
+CREATE TABLE IF NOT EXISTS author_post_counts (
+    author_id INT PRIMARY KEY,
+    post_count INT NOT NULL DEFAULT 0
+);
+
+-- File blobs table (content-addressed attachments, one S3 object per distinct content)
+CREATE TABLE IF NOT EXISTS file_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    s3_key VARCHAR(255) NOT NULL,
+    size BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Files table (one row per upload, file_id -> blob)
+CREATE TABLE IF NOT EXISTS files (
+    file_id VARCHAR(255) PRIMARY KEY,
+    blob_sha256 CHAR(64) NOT NULL,
+    original_name VARCHAR(255) NOT NULL,
+    content_type VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_files_blob_sha256 (blob_sha256),
+    FOREIGN KEY (blob_sha256) REFERENCES file_blobs(sha256)
+);
+
+-- Upload jobs table (staged uploads: incoming/ object -> validated, hashed blob)
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    file_id VARCHAR(255) PRIMARY KEY,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    staging_key VARCHAR(255) NOT NULL,
+    original_name VARCHAR(255) NOT NULL,
+    declared_type VARCHAR(255),
+    content_type VARCHAR(255),
+    sha256 CHAR(64),
+    size BIGINT,
+    attempts INT NOT NULL DEFAULT 0,
+    error VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_upload_jobs_status_updated_at (status, updated_at)
 );
@@ -1,77 +1,217 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, redirect
+import click
+import json
+from werkzeug.http import http_date, is_resource_modified
 from werkzeug.utils import secure_filename
 import os
 import uuid
-import boto3
+from datetime import timedelta
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 from config import Config
-from io import BytesIO
+from storage import S3ClientFactory
+from cache import TTLCache
+from derivatives import DerivativeGenerator, is_image
+from models import db
+from blobs import BlobStore, UploadNotReady
+from pipeline import UploadPipeline, UploadRejected
+from service_client import client_from_env
+from sweeper import OrphanSweeper, PostRefsUnavailable
+import metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# S3 클라이언트 초기화
-def get_s3_client():
+db.init_app(app)
+metrics.init_app(app, 'file-service')
+metrics.instrument_sqlalchemy()
+
+POST_SERVICE_URL = os.environ.get('POST_SERVICE_URL', 'http://post-service:5002')
+
+# 고아 첨부파일 정리 시 게시글 참조 여부 확인용
+post_service = metrics.instrument_client(
+    client_from_env('post-service', POST_SERVICE_URL, 'POST_SERVICE')
+)
+
+s3_clients = S3ClientFactory(app.config, on_create=metrics.instrument_s3_client)
+
+# S3 클라이언트 (워커당 하나를 재사용)
+def get_s3_client(public=False):
     try:
-        if app.config['S3_ENDPOINT_URL']:
-            # MinIO 등 다른 S3 호환 서비스 사용~!
-            return boto3.client(
-                's3',
-                aws_access_key_id=app.config['AWS_ACCESS_KEY_ID'],
-                aws_secret_access_key=app.config['AWS_SECRET_ACCESS_KEY'],
-                endpoint_url=app.config['S3_ENDPOINT_URL'],
-                region_name=app.config['AWS_DEFAULT_REGION']
-            )
-        else:
-            # AWS S3 사용
-            return boto3.client(
-                's3',
-                aws_access_key_id=app.config['AWS_ACCESS_KEY_ID'],
-                aws_secret_access_key=app.config['AWS_SECRET_ACCESS_KEY'],
-                region_name=app.config['AWS_DEFAULT_REGION']
-            )
+        return s3_clients.get(public=public)
     except Exception as e:
         app.logger.error(f"S3 클라이언트 초기화 실패: {e}")
         raise e
 
+def create_tables():
+    db.create_all()
+
+def s3_key_for(file_id, variant=None):
+    key = blob_store.object_key(file_id)
+    return derivatives.variant_key(key, variant) if variant else key
+
+def is_internal_request():
+    # 토큰이 없으면 거부한다. 토큰 없는 개발 환경은 INTERNAL_API_INSECURE로 명시적으로 허용
+    expected = app.config['INTERNAL_API_TOKEN']
+    if not expected:
+        return app.config['INTERNAL_API_INSECURE']
+    return request.headers.get('X-Internal-Token') == expected
+
+def is_not_found(error):
+    # get_object는 NoSuchKey, head_object는 404 코드를 돌려줌
+    return error.response['Error']['Code'] in ('NoSuchKey', '404', 'NotFound')
+
+metadata_cache = TTLCache(
+    ttl=app.config['METADATA_CACHE_TTL'],
+    maxsize=app.config['METADATA_CACHE_SIZE']
+)
+
+def unrenderable_key(s3_key):
+    # 파생본을 만들 수 없는 원본 표시 (내용 해시 키 기준이라 같은 내용의 다른 file_id에도 적용)
+    return f'{s3_key}:unrenderable'
+
+def remember_unrenderable(s3_key):
+    metadata_cache.set(unrenderable_key(s3_key), True)
+
+# 업로드된 이미지의 썸네일/웹용 파생본을 요청 처리와 분리해 생성
+derivatives = DerivativeGenerator(s3_clients, app.config, app.logger, on_failed=remember_unrenderable)
+
+def get_file_metadata(file_id, variant=None):
+    # file_id는 UUID 기반이라 내용이 바뀌지 않으므로 head_object 결과를 캐시
+    cache_key = f'{file_id}:{variant}' if variant else file_id
+    metadata = metadata_cache.get(cache_key)
+    if metadata is None:
+        response = get_s3_client().head_object(
+            Bucket=app.config['S3_BUCKET_NAME'],
+            Key=s3_key_for(file_id, variant)
+        )
+        metadata = {
+            'size': response['ContentLength'],
+            'last_modified': response['LastModified'],
+            'etag': response['ETag'].strip('"'),
+            'content_type': response.get('ContentType', 'application/octet-stream')
+        }
+        if variant is None:
+            # 같은 blob을 여러 형식으로 올렸을 수 있으므로 업로드 시 받은 Content-Type 사용
+            metadata['content_type'] = blob_store.content_type(file_id) or metadata['content_type']
+        metadata_cache.set(cache_key, metadata)
+    return metadata
+
+def cache_headers(metadata, cacheable=True):
+    return {
+        'ETag': f'"{metadata["etag"]}"',
+        'Last-Modified': http_date(metadata['last_modified']),
+        'Cache-Control': (
+            f"public, max-age={app.config['FILE_CACHE_MAX_AGE']}, immutable" if cacheable else 'no-store'
+        )
+    }
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+# 큰 파일은 멀티파트로 나눠 올려 메모리 사용량을 청크 크기로 제한
+transfer_config = TransferConfig(
+    multipart_threshold=app.config['S3_MULTIPART_THRESHOLD'],
+    multipart_chunksize=app.config['S3_MULTIPART_CHUNKSIZE'],
+    max_concurrency=app.config['S3_UPLOAD_CONCURRENCY']
+)
+
+blob_store = BlobStore(s3_clients, app.config, derivatives, transfer_config)
+
+def internal_headers():
+    token = app.config['INTERNAL_API_TOKEN']
+    return {'X-Internal-Token': token} if token else {}
+
+def detach_attachment(file_id, error):
+    # 검사에 실패한 첨부파일을 게시글에서 떼어내도록 post-service에 알린다 (실패해도 다운로드는 404)
+    try:
+        response = post_service.post(
+            '/internal/posts/detach-file',
+            json={'file_id': file_id, 'reason': error},
+            headers=internal_headers()
+        )
+        if response.status_code != 200:
+            app.logger.warning(f'첨부 해제 알림 실패 ({file_id}): {response.status_code}')
+    except Exception as e:
+        app.logger.warning(f'첨부 해제 알림 실패 ({file_id}): {e}')
+
+# 단계적 업로드: 요청에서는 incoming/ 에 받아 두기만 하고 검사/해시/승격은 백그라운드에서 처리
+upload_pipeline = UploadPipeline(
+    app, s3_clients, blob_store, derivatives, transfer_config, on_failed=detach_attachment
+)
+
+def upload_status_response(status):
+    # 처리 중이면 202, 끝났으면 200
+    code = 200 if status['status'] in ('ready', 'failed') else 202
+    return jsonify(dict(status, status_url=f"/uploads/{status['file_id']}")), code
+
+def upload_not_ready(job):
+    if job.status == 'failed':
+        return jsonify({'error': '파일을 찾을 수 없습니다', 'status': job.status}), 404
+    response = jsonify({'error': '파일을 처리하는 중입니다', 'status': job.status})
+    response.headers['Retry-After'] = '2'
+    return response, 409
+
+def get_upload_source():
+    # multipart/form-data 업로드 또는 ?filename= 과 함께 본문 전체를 파일로 보내는 스트리밍 업로드
+    if request.mimetype == 'multipart/form-data':
+        file = request.files.get('file')
+        if file is None:
+            return None, None, None
+        return file.filename, file.stream, file.content_type
+    filename = request.args.get('filename', '')
+    return filename, request.stream, request.mimetype
+
+def iter_body(body, chunk_size):
+    try:
+        for chunk in body.iter_chunks(chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     try:
-        if 'file' not in request.files:
+        filename, stream, content_type = get_upload_source()
+        if not filename:
             return jsonify({'error': '파일이 선택되지 않았습니다'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': '파일이 선택되지 않았습니다'}), 400
-        
-        if file and allowed_file(file.filename):
-            original_filename = secure_filename(file.filename)
+        if allowed_file(filename):
+            original_filename = secure_filename(filename)
             file_extension = original_filename.rsplit('.', 1)[1].lower()
             unique_filename = f"{uuid.uuid4()}.{file_extension}"
             
-            # S3에 파일 업로드
-            s3_client = get_s3_client()
-            file_data = file.read()
-            file.seek(0)  # 파일 포인터를 처음으로 되돌림
-            
-            # S3 업로드 경로 구성
-            s3_key = f"{app.config['S3_UPLOADS_PATH'].rstrip('/')}/{unique_filename}"
+            if app.config['UPLOAD_PIPELINE']:
+                # 본문을 임시 위치에 받아 두기만 하고 바로 응답 (형식 확인/해시/승격은 백그라운드)
+                upload_pipeline.accept(
+                    stream,
+                    unique_filename,
+                    original_filename,
+                    content_type or 'application/octet-stream'
+                )
+                return upload_status_response(upload_pipeline.status(unique_filename))
             
-            s3_client.put_object(
-                Bucket=app.config['S3_BUCKET_NAME'],
-                Key=s3_key,
-                Body=file_data,
-                ContentType=file.content_type or 'application/octet-stream'
+            # 내용 해시로 저장: 같은 파일이 이미 있으면 S3 업로드를 건너뛴다
+            s3_key, created = blob_store.store(
+                stream,
+                unique_filename,
+                original_filename,
+                content_type or 'application/octet-stream'
             )
             
+            variants = []
+            if is_image(unique_filename):
+                if not created or derivatives.submit(s3_key):
+                    variants = list(app.config['IMAGE_VARIANTS'])
+            
             return jsonify({
                 'message': '파일이 S3에 업로드되었습니다',
                 'file_id': unique_filename,
-                'original_name': original_filename
+                'original_name': original_filename,
+                'status': 'ready',
+                'variants': variants,
+                'deduplicated': not created
             }), 200
         else:
             return jsonify({'error': '허용되지 않는 파일 형식입니다'}), 400
@@ -82,32 +222,190 @@ def upload_file():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/upload-url', methods=['POST'])
+def create_upload_url():
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = data.get('filename', '')
+        content_type = data.get('content_type') or 'application/octet-stream'
+        size = data.get('size')
+        
+        if not filename:
+            return jsonify({'error': '파일이 선택되지 않았습니다'}), 400
+        if not allowed_file(filename):
+            return jsonify({'error': '허용되지 않는 파일 형식입니다'}), 400
+        if size is not None and (not isinstance(size, int) or size > app.config['MAX_CONTENT_LENGTH']):
+            return jsonify({'error': '파일 크기가 제한을 초과했습니다'}), 413
+        
+        original_filename = secure_filename(filename)
+        file_extension = original_filename.rsplit('.', 1)[1].lower()
+        unique_filename = f"{uuid.uuid4()}.{file_extension}"
+        if app.config['UPLOAD_PIPELINE']:
+            # incoming/ 에 올린 뒤 /uploads/<file_id>/complete 요청으로 검사/승격을 시작한다
+            s3_key = upload_pipeline.staging_key(unique_filename)
+        else:
+            # 브라우저가 직접 올리므로 내용 해시를 알 수 없어 uploads/<file_id>에 저장된다
+            s3_key = blob_store.legacy_key(unique_filename)
+        
+        # 브라우저가 S3로 직접 올리는 POST 정책 (크기/Content-Type을 S3가 검증)
+        presigned = get_s3_client(public=True).generate_presigned_post(
+            Bucket=app.config['S3_BUCKET_NAME'],
+            Key=s3_key,
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, app.config['MAX_CONTENT_LENGTH']]
+            ],
+            ExpiresIn=app.config['PRESIGNED_URL_EXPIRES']
+        )
+        if app.config['UPLOAD_PIPELINE']:
+            upload_pipeline.reserve(unique_filename, original_filename, content_type)
+        
+        return jsonify({
+            'url': presigned['url'],
+            'fields': presigned['fields'],
+            'file_id': unique_filename,
+            'original_name': original_filename,
+            'expires_in': app.config['PRESIGNED_URL_EXPIRES']
+        }), 200
+    except NoCredentialsError:
+        return jsonify({'error': 'S3 인증 정보가 올바르지 않습니다'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/uploads/<file_id>/complete', methods=['POST'])
+def complete_upload(file_id):
+    # presigned 업로드를 마친 뒤 호출: 검사/승격 작업을 대기열에 넣는다
+    try:
+        if upload_pipeline.complete(file_id) is None:
+            # 작업 기록이 없으면 UPLOAD_PIPELINE=false로 발급한 업로드: uploads/<file_id> 객체가 있으면 완료
+            return get_upload_status(file_id)
+        return upload_status_response(upload_pipeline.status(file_id))
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 400
+    except ClientError as e:
+        return jsonify({'error': f'S3 파일 정보 조회 실패: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/uploads/<file_id>')
+def get_upload_status(file_id):
+    # pending | processing | ready | failed (post-service가 첨부 가능 여부 확인에 사용)
+    try:
+        status = upload_pipeline.status(file_id)
+        if status is None:
+            # 단계적 업로드/중복 제거 이전 파일은 객체가 있으면 완료 상태
+            # (다른 워커에서 삭제됐을 수 있으므로 캐시가 아닌 S3에서 확인)
+            metadata_cache.delete(file_id)
+            try:
+                metadata = get_file_metadata(file_id)
+            except ClientError as e:
+                if is_not_found(e):
+                    return jsonify({'file_id': file_id, 'error': '파일을 찾을 수 없습니다'}), 404
+                raise
+            status = {
+                'file_id': file_id,
+                'status': 'ready',
+                'content_type': metadata['content_type'],
+                'size': metadata['size']
+            }
+        return upload_status_response(status)
+    except ClientError as e:
+        return jsonify({'error': f'S3 파일 정보 조회 실패: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def resolve_variant(file_id, variant):
+    # 파생본이 아직 없으면 생성을 예약하고 원본으로 대체 (None 반환)
+    # 생성에 실패한 원본은 캐시 TTL 동안 다시 예약하지 않고 원본만 돌려준다
+    try:
+        get_file_metadata(file_id, variant)
+        return variant
+    except ClientError as e:
+        if not is_not_found(e):
+            raise
+    s3_key = s3_key_for(file_id)
+    if not metadata_cache.get(unrenderable_key(s3_key)):
+        derivatives.submit(s3_key)
+    return None
+
 @app.route('/download/<file_id>')
 def download_file(file_id):
     try:
-        s3_client = get_s3_client()
+        variant = request.args.get('variant')
+        fallback = False
+        if variant:
+            if variant not in app.config['IMAGE_VARIANTS'] or not is_image(file_id):
+                return jsonify({'error': '지원하지 않는 variant입니다'}), 400
+            variant = resolve_variant(file_id, variant)
+            fallback = variant is None
         
         # S3에서 파일 다운로드 (uploads 디렉토리에서)
-        s3_key = f"{app.config['S3_UPLOADS_PATH'].rstrip('/')}/{file_id}"
-        response = s3_client.get_object(
-            Bucket=app.config['S3_BUCKET_NAME'],
-            Key=s3_key
-        )
+        s3_key = s3_key_for(file_id, variant)
+        download_name = f'{file_id}.{variant}' if variant else file_id
+        # 파생본은 <img>로 바로 보여주고, 원본은 다운로드
+        disposition = 'inline' if variant else 'attachment'
         
-        file_data = response['Body'].read()
+        if app.config['PRESIGNED_DOWNLOADS'] or request.args.get('redirect') == '1':
+            # 짧은 유효기간의 presigned GET으로 리다이렉트해 본문이 워커를 거치지 않게 함
+            url = get_s3_client(public=True).generate_presigned_url(
+                'get_object',
+                Params={
+                    'Bucket': app.config['S3_BUCKET_NAME'],
+                    'Key': s3_key,
+                    'ResponseContentDisposition': f'{disposition}; filename="{download_name}"'
+                },
+                ExpiresIn=app.config['PRESIGNED_URL_EXPIRES']
+            )
+            return redirect(url, code=302)
         
-        # BytesIO 객체로 변환하여 Flask에서 처리
-        file_obj = BytesIO(file_data)
+        # 조건부 요청은 캐시된 메타데이터만으로 304 응답 (본문 조회 없음)
+        metadata = get_file_metadata(file_id, variant)
+        if not is_resource_modified(
+            request.environ,
+            etag=metadata['etag'],
+            last_modified=metadata['last_modified']
+        ):
+            return Response(status=304, headers=cache_headers(metadata, cacheable=not fallback))
         
-        return send_file(
-            file_obj,
-            as_attachment=True,
-            download_name=file_id,
-            mimetype=response.get('ContentType', 'application/octet-stream')
+        s3_client = get_s3_client()
+        params = {
+            'Bucket': app.config['S3_BUCKET_NAME'],
+            'Key': s3_key
+        }
+        range_header = request.headers.get('Range')
+        if range_header:
+            params['Range'] = range_header
+        response = s3_client.get_object(**params)
+        content_type = metadata['content_type'] if variant is None else response.get('ContentType')
+        
+        # 본문을 청크 단위로 흘려보내 요청당 메모리를 일정하게 유지
+        headers = {
+            'Content-Length': str(response['ContentLength']),
+            'Content-Disposition': f'{disposition}; filename="{download_name}"',
+            'Accept-Ranges': 'bytes'
+        }
+        # 파생본이 준비되면 바뀌므로 원본 대체 응답은 캐시하지 않음
+        headers.update(cache_headers(metadata, cacheable=not fallback))
+        status = 200
+        if response.get('ContentRange'):
+            headers['Content-Range'] = response['ContentRange']
+            status = 206
+        
+        return Response(
+            iter_body(response['Body'], app.config['DOWNLOAD_CHUNK_SIZE']),
+            status=status,
+            headers=headers,
+            mimetype=content_type or 'application/octet-stream',
+            direct_passthrough=True
         )
+    except UploadNotReady as e:
+        return upload_not_ready(e.job)
     except ClientError as e:
-        if e.response['Error']['Code'] == 'NoSuchKey':
+        if is_not_found(e):
             return jsonify({'error': '파일을 찾을 수 없습니다'}), 404
+        elif e.response['Error']['Code'] == 'InvalidRange':
+            return jsonify({'error': '요청한 범위가 올바르지 않습니다'}), 416
         else:
             return jsonify({'error': f'S3 다운로드 실패: {str(e)}'}), 500
     except Exception as e:
@@ -116,24 +414,20 @@ def download_file(file_id):
 @app.route('/files/<file_id>')
 def get_file_info(file_id):
     try:
-        s3_client = get_s3_client()
-        
-        # S3에서 파일 정보 확인 (uploads 디렉토리에서)
-        s3_key = f"{app.config['S3_UPLOADS_PATH'].rstrip('/')}/{file_id}"
-        response = s3_client.head_object(
-            Bucket=app.config['S3_BUCKET_NAME'],
-            Key=s3_key
-        )
+        # S3에서 파일 정보 확인 (uploads 디렉토리에서, 캐시 우선)
+        metadata = get_file_metadata(file_id)
         
         return jsonify({
             'file_id': file_id,
             'exists': True,
-            'size': response['ContentLength'],
-            'last_modified': response['LastModified'].isoformat(),
-            'content_type': response.get('ContentType', 'application/octet-stream')
+            'size': metadata['size'],
+            'last_modified': metadata['last_modified'].isoformat(),
+            'content_type': metadata['content_type']
         }), 200
+    except UploadNotReady as e:
+        return upload_not_ready(e.job)
     except ClientError as e:
-        if e.response['Error']['Code'] == 'NoSuchKey':
+        if is_not_found(e):
             return jsonify({
                 'file_id': file_id,
                 'exists': False
@@ -143,9 +437,77 @@ def get_file_info(file_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# post-service가 게시글 삭제 시 호출: 참조를 지우고 마지막 참조면 S3 객체도 삭제
+@app.route('/internal/files/<file_id>', methods=['DELETE'])
+def delete_file(file_id):
+    if not is_internal_request():
+        return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+    try:
+        deleted_keys = blob_store.release(file_id)
+        metadata_cache.delete(file_id)
+        for variant in app.config['IMAGE_VARIANTS']:
+            metadata_cache.delete(f'{file_id}:{variant}')
+        if deleted_keys:
+            metadata_cache.delete(unrenderable_key(deleted_keys[0]))
+        return jsonify({'file_id': file_id, 'deleted_objects': len(deleted_keys)}), 200
+    except ClientError as e:
+        return jsonify({'error': f'S3 삭제 실패: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# 게시글이 참조하지 않는 첨부파일 정리 (cron 등에서 주기 실행, 기본은 dry-run 보고만)
+#   flask --app app sweep-orphans --grace-hours 24 --rate 50
+#   flask --app app sweep-orphans --delete --max-deletes 10000
+@app.cli.command('sweep-orphans')
+@click.option('--delete', 'delete', is_flag=True, help='보고만 하지 않고 실제로 삭제')
+@click.option('--grace-hours', type=float, default=None, help='이보다 최근 객체는 건드리지 않음')
+@click.option('--page-size', type=int, default=None, help='버킷 목록/DB 조회 단위')
+@click.option('--rate', type=float, default=None, help='초당 최대 삭제 수 (0이면 제한 없음)')
+@click.option('--max-deletes', type=int, default=None, help='이번 실행에서 삭제할 최대 수')
+def sweep_orphans(delete, grace_hours, page_size, rate, max_deletes):
+    sweeper = OrphanSweeper(
+        s3_clients,
+        blob_store,
+        post_service,
+        app.config,
+        app.logger,
+        grace=timedelta(hours=app.config['SWEEP_GRACE_HOURS'] if grace_hours is None else grace_hours),
+        page_size=page_size or app.config['SWEEP_PAGE_SIZE'],
+        deletes_per_second=app.config['SWEEP_DELETES_PER_SEC'] if rate is None else rate,
+        refs_batch_size=app.config['SWEEP_REFS_BATCH_SIZE'],
+        max_deletes=app.config['SWEEP_MAX_DELETES'] if max_deletes is None else max_deletes,
+        dry_run=not delete,
+        internal_token=app.config['INTERNAL_API_TOKEN']
+    )
+    try:
+        report = sweeper.run()
+    except PostRefsUnavailable as e:
+        # 참조 확인이 안 되면 중단 (지금까지 삭제한 것은 참조가 없다고 확인된 것뿐)
+        raise click.ClickException(f'게시글 참조 조회 실패, 정리 중단: {e} (deleted={sweeper.report["deleted"]})')
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+
+# 단계적 업로드 작업 재처리/정리 (cron 등에서 주기 실행)
+#   flask --app app process-uploads
+#   flask --app app process-uploads --stale-minutes 30 --limit 500 --retention-days 3
+@app.cli.command('process-uploads')
+@click.option('--stale-minutes', type=float, default=None, help='이보다 오래 멈춘 작업은 다시 처리')
+@click.option('--limit', type=int, default=100, help='이번 실행에서 처리할 최대 작업 수')
+@click.option('--retention-days', type=float, default=None, help='끝난 작업 기록 보관 기간')
+def process_uploads(stale_minutes, limit, retention_days):
+    stale = app.config['UPLOAD_STALE_MINUTES'] if stale_minutes is None else stale_minutes
+    retention = app.config['UPLOAD_JOB_RETENTION_DAYS'] if retention_days is None else retention_days
+    report = upload_pipeline.recover(timedelta(minutes=stale), limit=limit)
+    report['purged'] = upload_pipeline.purge(timedelta(days=retention))
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
+
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'healthy'}), 200
+    return jsonify({
+        'status': 'healthy',
+        's3_clients_created': s3_clients.created_count
+    }), 200
 
 if __name__ == '__main__':
+    with app.app_context():
+        create_tables()
     app.run(host='0.0.0.0', port=5003)
@@ -0,0 +1,182 @@
+import hashlib
+import tempfile
+
+from sqlalchemy.exc import IntegrityError
+
+from cache import TTLCache
+from models import db, Blob, StoredFile, UploadJob
+
+
+# 아직 승격되지 않은 단계적 업로드 상태 (ready/failed 기록은 파일 조회를 막지 않는다)
+IN_PROGRESS = ('uploading', 'pending', 'processing')
+
+
+class UploadNotReady(Exception):
+    # 단계적 업로드가 아직 승격되지 않았거나 검사에 실패한 file_id
+    def __init__(self, job):
+        super().__init__(f'upload {job.file_id} is {job.status}')
+        self.job = job
+
+
+def spool_and_hash(stream, chunk_size, max_memory):
+    # 업로드 본문을 임시 파일(작으면 메모리)에 옮기면서 SHA-256 계산
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        spooled.write(chunk)
+        size += len(chunk)
+    spooled.seek(0)
+    return spooled, digest.hexdigest(), size
+
+
+class BlobStore:
+    # 내용 주소(SHA-256) 기반 중복 제거 저장소
+    #  - 같은 내용이 이미 있으면 S3 PUT 없이 참조 수만 늘린다
+    #  - 참조 수가 0이 되면 blob 행을 잠근 상태에서 S3 객체(파생본 포함)를 지운다
+    def __init__(self, s3_clients, config, derivatives, transfer_config):
+        self.s3_clients = s3_clients
+        self.bucket = config['S3_BUCKET_NAME']
+        self.prefix = config['S3_UPLOADS_PATH'].rstrip('/')
+        self.chunk_size = config['UPLOAD_HASH_CHUNK_SIZE']
+        self.spool_memory = config['UPLOAD_SPOOL_MEMORY']
+        self.variants = config['IMAGE_VARIANTS']
+        self.derivatives = derivatives
+        self.transfer_config = transfer_config
+        # file_id → blob 키 매핑은 삭제 전까지 바뀌지 않으므로 캐시
+        self._keys = TTLCache(ttl=config['METADATA_CACHE_TTL'], maxsize=config['METADATA_CACHE_SIZE'])
+
+    def blob_key(self, sha256):
+        return f'{self.prefix}/sha256/{sha256[:2]}/{sha256}'
+
+    def legacy_key(self, file_id):
+        # 중복 제거 이전 업로드와 presigned 업로드는 uploads/<file_id>에 그대로 있다
+        return f'{self.prefix}/{file_id}'
+
+    def object_key(self, file_id):
+        key = self._keys.get(file_id)
+        if key is None:
+            stored = db.session.get(StoredFile, file_id)
+            if stored is None:
+                # 처리 중인 업로드는 승격되면 키가 바뀌므로 캐시하지 않는다
+                job = db.session.get(UploadJob, file_id)
+                if job is not None and job.status in IN_PROGRESS:
+                    raise UploadNotReady(job)
+            key = self.blob_key(stored.blob_sha256) if stored else self.legacy_key(file_id)
+            self._keys.set(file_id, key)
+        return key
+
+    def content_type(self, file_id):
+        stored = db.session.get(StoredFile, file_id)
+        return stored.content_type if stored else None
+
+    def store(self, stream, file_id, original_name, content_type):
+        # (blob 키, 새로 올렸는지 여부) 반환
+        spooled, sha256, size = spool_and_hash(stream, self.chunk_size, self.spool_memory)
+        try:
+            def upload(key):
+                spooled.seek(0)
+                self.s3_clients.get().upload_fileobj(
+                    spooled,
+                    self.bucket,
+                    key,
+                    ExtraArgs={'ContentType': content_type},
+                    Config=self.transfer_config
+                )
+            return self._save(file_id, sha256, size, original_name, content_type, upload)
+        finally:
+            spooled.close()
+
+    def promote(self, staging_key, file_id, sha256, size, original_name, content_type):
+        # 단계적 업로드: incoming/ 객체를 내용 주소 키로 서버 측 복사 (같은 내용이 있으면 복사 없이 참조만)
+        def copy(key):
+            self.s3_clients.get().copy(
+                {'Bucket': self.bucket, 'Key': staging_key},
+                self.bucket,
+                key,
+                ExtraArgs={'ContentType': content_type, 'MetadataDirective': 'REPLACE'},
+                Config=self.transfer_config
+            )
+        return self._save(file_id, sha256, size, original_name, content_type, copy)
+
+    def _save(self, file_id, sha256, size, original_name, content_type, write):
+        try:
+            for _ in range(2):
+                try:
+                    created = self._link(sha256, size, write)
+                    db.session.add(StoredFile(
+                        file_id=file_id,
+                        blob_sha256=sha256,
+                        original_name=original_name,
+                        content_type=content_type
+                    ))
+                    db.session.commit()
+                    return self.blob_key(sha256), created
+                except IntegrityError:
+                    # 같은 내용이 동시에 처음 올라온 경우: 먼저 커밋된 blob을 참조
+                    db.session.rollback()
+            raise RuntimeError(f'could not store blob {sha256}')
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _link(self, sha256, size, write):
+        blob = Blob.query.filter_by(sha256=sha256).with_for_update().first()
+        if blob is not None:
+            blob.ref_count += 1
+            return False
+
+        # blob 행을 먼저 넣어(잠금) 같은 키를 지우는 중인 release와 겹치지 않게 한 뒤 업로드
+        blob = Blob(sha256=sha256, s3_key=self.blob_key(sha256), size=size, ref_count=1)
+        db.session.add(blob)
+        db.session.flush()
+        write(blob.s3_key)
+        return True
+
+    def release(self, file_id):
+        # file_id 참조를 지우고, 마지막 참조였다면 S3 객체까지 삭제. 삭제한 키 목록 반환
+        # 업로드 작업 기록도 함께 지워 상태 조회가 삭제된 파일을 ready로 돌려주지 않게 한다
+        self._keys.delete(file_id)
+        stored = db.session.get(StoredFile, file_id)
+        if stored is None:
+            self._delete_job(file_id)
+            keys = self._object_keys(self.legacy_key(file_id))
+            self._delete_objects(keys)
+            return keys
+
+        try:
+            blob = Blob.query.filter_by(sha256=stored.blob_sha256).with_for_update().one()
+            UploadJob.query.filter_by(file_id=file_id).delete(synchronize_session=False)
+            db.session.delete(stored)
+            blob.ref_count -= 1
+            keys = []
+            if blob.ref_count <= 0:
+                keys = self._object_keys(blob.s3_key)
+                self._delete_objects(keys)
+                db.session.delete(blob)
+            db.session.commit()
+            return keys
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _delete_job(self, file_id):
+        try:
+            UploadJob.query.filter_by(file_id=file_id).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _object_keys(self, key):
+        return [key] + [self.derivatives.variant_key(key, variant) for variant in self.variants]
+
+    def _delete_objects(self, keys):
+        self.s3_clients.get().delete_objects(
+            Bucket=self.bucket,
+            Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+        )
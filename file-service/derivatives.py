@@ -0,0 +1,130 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+IMAGE_EXTENSIONS = frozenset(['png', 'jpg', 'jpeg', 'gif'])
+
+
+def is_image(file_id):
+    return '.' in file_id and file_id.rsplit('.', 1)[1].lower() in IMAGE_EXTENSIONS
+
+
+def output_format(has_alpha):
+    # WebP를 지원하지 않는 Pillow 빌드에서는 JPEG(투명 배경이면 PNG)로 대체
+    if features.check('webp'):
+        return 'WEBP', 'webp', 'image/webp'
+    if has_alpha:
+        return 'PNG', 'png', 'image/png'
+    return 'JPEG', 'jpg', 'image/jpeg'
+
+
+def render_variant(data, max_size, quality=80):
+    # 원본 바이트 → 축소된 이미지 바이트. EXIF 방향은 픽셀에 반영하고 메타데이터는 모두 버린다.
+    with Image.open(io.BytesIO(data)) as source:
+        source.seek(0)  # 움직이는 GIF는 첫 프레임만 사용
+        if source.format == 'JPEG':
+            # JPEG은 디코딩 단계에서 바로 1/2~1/8로 줄여 읽는다
+            source.draft('RGB', (max_size, max_size))
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        image.thumbnail((max_size, max_size), Image.LANCZOS)
+
+        pil_format, extension, content_type = output_format(has_alpha)
+        if pil_format == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        image.save(output, format=pil_format, quality=quality, optimize=True)
+        return output.getvalue(), extension, content_type
+
+
+class DerivativeGenerator:
+    # 업로드 요청과 분리된 스레드 풀에서 썸네일/웹용 이미지를 만들어 원본 옆에 저장
+    # (Pillow는 리사이즈/인코딩 중 GIL을 놓으므로 워커 프로세스 안의 스레드 풀로 충분)
+    def __init__(self, s3_clients, config, logger, on_failed=None):
+        self.s3_clients = s3_clients
+        self.bucket = config['S3_BUCKET_NAME']
+        self.variants = config['IMAGE_VARIANTS']
+        self.quality = config['IMAGE_QUALITY']
+        self.max_pixels = config['IMAGE_MAX_PIXELS']
+        self.max_workers = config['IMAGE_DERIVATIVE_WORKERS']
+        self.logger = logger
+        # 원본을 디코딩할 수 없어 다시 시도해도 실패할 이미지를 호출자에게 알린다 (s3_key를 받음)
+        self.on_failed = on_failed
+        self._slots = threading.BoundedSemaphore(max(config['IMAGE_DERIVATIVE_MAX_PENDING'], 1))
+        self._pending = set()
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def variant_key(self, s3_key, variant):
+        # 원본 키 옆에 저장: uploads/<file_id>.thumb (형식은 ContentType으로 구분)
+        return f'{s3_key}.{variant}'
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='derivatives'
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, s3_key):
+        # 대기열이 가득 차면 건너뛴다 (variant 요청 시 다시 예약됨)
+        if self.max_workers <= 0:
+            return False
+        with self._lock:
+            if s3_key in self._pending:
+                return True
+            if not self._slots.acquire(blocking=False):
+                return False
+            self._pending.add(s3_key)
+        try:
+            future = self._get_executor().submit(self.generate, s3_key)
+        except Exception:
+            self._done(s3_key)
+            raise
+        future.add_done_callback(lambda _: self._done(s3_key))
+        return True
+
+    def _done(self, s3_key):
+        with self._lock:
+            self._pending.discard(s3_key)
+        self._slots.release()
+
+    def generate(self, s3_key):
+        try:
+            s3_client = self.s3_clients.get()
+            data = s3_client.get_object(Bucket=self.bucket, Key=s3_key)['Body'].read()
+        except Exception:
+            # S3 오류는 일시적일 수 있으므로 기록하지 않는다 (다음 variant 요청 때 다시 예약됨)
+            self.logger.exception(f'이미지 파생본 생성 실패: {s3_key}')
+            return False
+        try:
+            Image.MAX_IMAGE_PIXELS = self.max_pixels  # 압축 폭탄 방지
+            rendered = {
+                variant: render_variant(data, max_size, self.quality)
+                for variant, max_size in self.variants.items()
+            }
+        except Exception:
+            # 손상되었거나 너무 큰 이미지: 같은 원본으로는 몇 번을 다시 해도 실패한다
+            self.logger.exception(f'이미지 파생본을 만들 수 없는 원본: {s3_key}')
+            if self.on_failed is not None:
+                self.on_failed(s3_key)
+            return False
+        try:
+            for variant, (body, _, content_type) in rendered.items():
+                s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.variant_key(s3_key, variant),
+                    Body=body,
+                    ContentType=content_type
+                )
+            return True
+        except Exception:
+            self.logger.exception(f'이미지 파생본 생성 실패: {s3_key}')
+            return False
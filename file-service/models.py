@@ -0,0 +1,44 @@
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+class Blob(db.Model):
+    # 내용(SHA-256)별로 S3에 한 번만 저장되는 객체. ref_count는 이 blob을 가리키는 files 행 수
+    __tablename__ = 'file_blobs'
+    
+    sha256 = db.Column(db.String(64), primary_key=True)
+    s3_key = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class StoredFile(db.Model):
+    # 업로드 한 번마다 생기는 file_id → blob 매핑 (게시글은 file_id를 참조)
+    __tablename__ = 'files'
+    
+    file_id = db.Column(db.String(255), primary_key=True)
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('file_blobs.sha256'), nullable=False, index=True)
+    original_name = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class UploadJob(db.Model):
+    # 단계적 업로드: incoming/ 에 임시로 받아 둔 객체를 백그라운드에서 검사/해시 후 blob으로 승격
+    # status: uploading(presigned 업로드 대기) → pending → processing → ready | failed
+    __tablename__ = 'upload_jobs'
+    __table_args__ = (
+        db.Index('ix_upload_jobs_status_updated_at', 'status', 'updated_at'),
+    )
+    
+    file_id = db.Column(db.String(255), primary_key=True)
+    status = db.Column(db.String(16), nullable=False, default='pending')
+    staging_key = db.Column(db.String(255), nullable=False)
+    original_name = db.Column(db.String(255), nullable=False)
+    declared_type = db.Column(db.String(255), nullable=True)  # 클라이언트가 보낸 Content-Type (참고용)
+    content_type = db.Column(db.String(255), nullable=True)  # 내용(매직 바이트)으로 판별한 형식
+    sha256 = db.Column(db.String(64), nullable=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
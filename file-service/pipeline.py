@@ -0,0 +1,360 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+from sqlalchemy import func, select, update
+
+from models import db, StoredFile, UploadJob
+
+OLE_STORAGE = 'application/x-ole-storage'  # doc/xls/ppt (OLE2 복합 문서)
+
+# 파일 앞부분 시그니처 → 판별 형식
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'%PDF-', 'application/pdf'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', OLE_STORAGE),
+)
+
+# 확장자 → (내용에서 판별되어야 하는 형식, 저장/응답에 쓸 Content-Type)
+EXTENSION_TYPES = {
+    'png': ('image/png', 'image/png'),
+    'jpg': ('image/jpeg', 'image/jpeg'),
+    'jpeg': ('image/jpeg', 'image/jpeg'),
+    'gif': ('image/gif', 'image/gif'),
+    'pdf': ('application/pdf', 'application/pdf'),
+    'zip': ('application/zip', 'application/zip'),
+    'docx': ('application/zip', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    'xlsx': ('application/zip', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'pptx': ('application/zip', 'application/vnd.openxmlformats-officedocument.presentationml.presentation'),
+    'doc': (OLE_STORAGE, 'application/msword'),
+    'xls': (OLE_STORAGE, 'application/vnd.ms-excel'),
+    'ppt': (OLE_STORAGE, 'application/vnd.ms-powerpoint'),
+    'rar': ('application/vnd.rar', 'application/vnd.rar'),
+    '7z': ('application/x-7z-compressed', 'application/x-7z-compressed'),
+    'txt': ('text/plain', 'text/plain'),
+}
+
+
+class UploadRejected(Exception):
+    # 다시 시도해도 성공할 수 없는 업로드 (형식 불일치, 빈 파일, 임시 객체 없음)
+    pass
+
+
+def sniff(head):
+    for signature, kind in SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    # 시그니처가 없고 NUL 바이트가 없으면 텍스트로 본다
+    if head and b'\x00' not in head:
+        return 'text/plain'
+    return None
+
+
+def detect_content_type(filename, head):
+    # 확장자를 믿지 않고 내용으로 확인: 선언한 확장자와 실제 형식이 맞아야 통과
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    expected = EXTENSION_TYPES.get(extension)
+    if expected is None:
+        raise UploadRejected('허용되지 않는 파일 형식입니다')
+    kind, content_type = expected
+    if sniff(head) != kind:
+        raise UploadRejected('파일 내용이 확장자와 일치하지 않습니다')
+    return content_type
+
+
+def db_now():
+    # created_at/updated_at은 DB의 CURRENT_TIMESTAMP(DB 타임존, 예: KST)로 기록되므로 기준 시각도 DB에서 가져온다
+    return db.session.execute(select(func.now())).scalar()
+
+
+def is_missing(error):
+    return error.response['Error']['Code'] in ('NoSuchKey', '404', 'NotFound')
+
+
+class UploadPipeline:
+    # 단계적 업로드
+    #  1. accept: 요청 본문을 incoming/<file_id> 로 그대로 스트리밍하고 작업(pending)을 남긴 뒤 바로 응답
+    #  2. process: 워커 프로세스의 스레드 풀이 임시 객체를 읽으며 매직 바이트로 형식을 확인하고 SHA-256 계산,
+    #     BlobStore로 승격(서버 측 복사/중복 제거)한 뒤 임시 객체를 지운다
+    #  3. recover: 대기열이 넘쳐 예약하지 못했거나 워커 종료로 멈춘 작업을 process-uploads 명령이 다시 처리
+    # 작업 상태 전이는 조건부 UPDATE로 가져가므로 여러 프로세스가 같은 작업을 중복 처리하지 않는다.
+    def __init__(self, app, s3_clients, blob_store, derivatives, transfer_config, on_failed=None):
+        config = app.config
+        self.app = app
+        self.s3_clients = s3_clients
+        self.blob_store = blob_store
+        self.derivatives = derivatives
+        self.transfer_config = transfer_config
+        self.bucket = config['S3_BUCKET_NAME']
+        self.prefix = config['S3_INCOMING_PATH'].rstrip('/')
+        self.chunk_size = config['UPLOAD_HASH_CHUNK_SIZE']
+        self.sniff_bytes = config['UPLOAD_SNIFF_BYTES']
+        self.max_attempts = config['UPLOAD_MAX_ATTEMPTS']
+        self.max_workers = config['UPLOAD_PROCESS_WORKERS']
+        self.on_failed = on_failed  # (file_id, error): 검사 실패 시 호출 (게시글 첨부 해제 알림 등)
+        self.logger = app.logger
+        self._slots = threading.BoundedSemaphore(max(config['UPLOAD_PROCESS_MAX_PENDING'], 1))
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def staging_key(self, file_id):
+        return f'{self.prefix}/{file_id}'
+
+    def accept(self, stream, file_id, original_name, declared_type):
+        staging_key = self.staging_key(file_id)
+        # 해시/검사 없이 멀티파트 업로드로 흘려보내기만 한다 (메모리는 청크 크기로 제한)
+        self.s3_clients.get().upload_fileobj(
+            stream,
+            self.bucket,
+            staging_key,
+            ExtraArgs={'ContentType': 'application/octet-stream'},
+            Config=self.transfer_config
+        )
+        try:
+            job = self._create_job(file_id, original_name, declared_type, 'pending')
+        except Exception:
+            self._delete_staging(staging_key)
+            raise
+        self.submit(file_id)
+        return job
+
+    def reserve(self, file_id, original_name, declared_type):
+        # presigned 업로드: 브라우저가 incoming/ 에 직접 올린 뒤 complete()로 처리를 요청한다
+        return self._create_job(file_id, original_name, declared_type, 'uploading')
+
+    def _create_job(self, file_id, original_name, declared_type, status):
+        job = UploadJob(
+            file_id=file_id,
+            status=status,
+            staging_key=self.staging_key(file_id),
+            original_name=original_name,
+            declared_type=declared_type
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return job
+
+    def complete(self, file_id):
+        job = db.session.get(UploadJob, file_id)
+        if job is None or job.status != 'uploading':
+            return job  # 이미 처리 중/완료된 작업은 그대로 돌려준다
+        try:
+            self.s3_clients.get().head_object(Bucket=self.bucket, Key=job.staging_key)
+        except ClientError as e:
+            if is_missing(e):
+                raise UploadRejected('업로드된 파일이 없습니다')
+            raise
+        self._transition(file_id, 'uploading', 'pending')
+        self.submit(file_id)
+        return db.session.get(UploadJob, file_id)
+
+    def status(self, file_id):
+        job = db.session.get(UploadJob, file_id)
+        if job is not None:
+            return {
+                'file_id': file_id,
+                'status': job.status,
+                'original_name': job.original_name,
+                'content_type': job.content_type,
+                'size': job.size,
+                'error': job.error
+            }
+        # 작업 기록이 없는 파일(단계적 업로드 이전, 정리된 작업)은 blob 매핑이 있으면 완료 상태
+        stored = db.session.get(StoredFile, file_id)
+        if stored is not None:
+            return {
+                'file_id': file_id,
+                'status': 'ready',
+                'original_name': stored.original_name,
+                'content_type': stored.content_type
+            }
+        return None
+
+    def _get_executor(self):
+        # gunicorn이 fork한 워커마다 자기 풀을 만든다
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='uploads'
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, file_id):
+        # 대기열이 가득 차면 예약하지 않는다 (작업은 pending으로 남아 process-uploads가 처리)
+        if self.max_workers <= 0:
+            return False
+        if not self._slots.acquire(blocking=False):
+            self.logger.warning(f'업로드 처리 대기열이 가득 참, 나중에 처리: {file_id}')
+            return False
+        try:
+            future = self._get_executor().submit(self._run, file_id)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _run(self, file_id):
+        with self.app.app_context():
+            try:
+                return self.process(file_id)
+            except Exception:
+                self.logger.exception(f'업로드 처리 실패: {file_id}')
+                return None
+
+    def _transition(self, file_id, from_status, to_status, **values):
+        try:
+            result = db.session.execute(
+                update(UploadJob)
+                .where(UploadJob.file_id == file_id, UploadJob.status == from_status)
+                .values(status=to_status, **values)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return result.rowcount == 1
+
+    def process(self, file_id):
+        # 처리한 뒤의 상태를 돌려준다. 다른 프로세스가 이미 가져간 작업이면 None
+        if not self._transition(file_id, 'pending', 'processing', attempts=UploadJob.attempts + 1):
+            return None
+        job = db.session.get(UploadJob, file_id)
+        try:
+            content_type, sha256, size = self.inspect(job)
+            created = False
+            # 승격 직후 상태 기록 전에 중단된 작업을 다시 처리하는 경우: 이미 만든 매핑을 그대로 쓴다
+            if db.session.get(StoredFile, file_id) is None:
+                s3_key, created = self.blob_store.promote(
+                    job.staging_key, file_id, sha256, size, job.original_name, content_type
+                )
+        except UploadRejected as e:
+            self._fail(job, str(e))
+            return 'failed'
+        except Exception as e:
+            db.session.rollback()
+            if job.attempts >= self.max_attempts:
+                self._fail(job, f'처리 실패: {e}'[:255])
+                return 'failed'
+            # 일시적인 오류: pending으로 되돌려 다시 처리 (process-uploads 또는 다음 예약)
+            self._transition(file_id, 'processing', 'pending', error=str(e)[:255])
+            raise
+
+        job.status = 'ready'
+        job.content_type = content_type
+        job.sha256 = sha256
+        job.size = size
+        job.error = None
+        db.session.commit()
+        self._delete_staging(job.staging_key)
+        # 새로 저장한 이미지면 파생본 생성 (중복 제거된 경우 이미 있다)
+        if created and content_type.startswith('image/'):
+            self.derivatives.submit(s3_key)
+        return 'ready'
+
+    def inspect(self, job):
+        # 임시 객체를 한 번만 읽으면서 앞부분으로 형식을 판별하고 전체 SHA-256/크기 계산
+        try:
+            body = self.s3_clients.get().get_object(Bucket=self.bucket, Key=job.staging_key)['Body']
+        except ClientError as e:
+            if is_missing(e):
+                raise UploadRejected('업로드된 파일이 없습니다')
+            raise
+        digest = hashlib.sha256()
+        head = b''
+        size = 0
+        try:
+            for chunk in body.iter_chunks(self.chunk_size):
+                if len(head) < self.sniff_bytes:
+                    head += chunk[:self.sniff_bytes - len(head)]
+                digest.update(chunk)
+                size += len(chunk)
+        finally:
+            body.close()
+        if size == 0:
+            raise UploadRejected('빈 파일입니다')
+        return detect_content_type(job.original_name, head), digest.hexdigest(), size
+
+    def _fail(self, job, error):
+        job.status = 'failed'
+        job.error = error
+        db.session.commit()
+        self._delete_staging(job.staging_key)
+        if self.on_failed:
+            self.on_failed(job.file_id, error)
+
+    def _delete_staging(self, staging_key):
+        try:
+            self.s3_clients.get().delete_object(Bucket=self.bucket, Key=staging_key)
+        except ClientError:
+            # 남은 임시 객체는 실패로 끝난 작업과 함께 로그로 남기고 넘어간다
+            self.logger.warning(f'임시 업로드 객체 삭제 실패: {staging_key}', exc_info=True)
+
+    def recover(self, stale_after, limit=100):
+        # process-uploads에서 주기 실행
+        #  - processing으로 오래 멈춘 작업(워커 종료 등)은 pending으로 되돌린다
+        #  - presigned 업로드를 끝내지 않고 떠난 작업은 실패 처리하고 임시 객체를 지운다
+        #  - pending 작업을 이 프로세스에서 차례로 처리한다
+        cutoff = db_now() - stale_after
+        report = {'requeued': 0, 'abandoned': 0, 'ready': 0, 'failed': 0, 'skipped': 0, 'errors': 0}
+        try:
+            report['requeued'] = db.session.execute(
+                update(UploadJob)
+                .where(UploadJob.status == 'processing', UploadJob.updated_at < cutoff)
+                .values(status='pending')
+            ).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        abandoned = UploadJob.query \
+            .filter(UploadJob.status == 'uploading', UploadJob.updated_at < cutoff) \
+            .limit(limit) \
+            .all()
+        for job in abandoned:
+            self._fail(job, '업로드가 완료되지 않았습니다')
+            report['abandoned'] += 1
+
+        file_ids = [
+            row.file_id for row in db.session.query(UploadJob.file_id)
+            .filter(UploadJob.status == 'pending')
+            .order_by(UploadJob.updated_at)
+            .limit(limit)
+        ]
+        for file_id in file_ids:
+            try:
+                status = self.process(file_id)
+            except Exception:
+                self.logger.exception(f'업로드 처리 실패: {file_id}')
+                report['errors'] += 1
+                continue
+            report[status or 'skipped'] += 1
+        return report
+
+    def purge(self, retention):
+        # 끝난 작업 기록 정리 (완료된 파일의 상태는 files 매핑으로 계속 조회된다)
+        cutoff = db_now() - retention
+        try:
+            deleted = UploadJob.query \
+                .filter(UploadJob.status.in_(('ready', 'failed')), UploadJob.updated_at < cutoff) \
+                .delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return deleted
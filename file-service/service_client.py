@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class RetryBudget:
+    # 최근 window초 동안의 요청 수 대비 ratio 만큼만 재시도를 허용 (재시도 폭주 방지)
+    def __init__(self, ratio=0.2, min_retries=3, window=10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        cutoff = now - self.window
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < cutoff:
+            self._retries.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            allowed = max(self.min_retries, int(len(self._requests) * self.ratio))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class CircuitBreaker:
+    # 연속 실패가 failure_threshold에 도달하면 reset_timeout 동안 호출을 즉시 거부하고,
+    # 그 뒤(half-open)에는 시험 요청 하나만 보내 결과에 따라 닫거나 다시 연다
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            # 시험 요청이 진행 중이면 거부. 결과가 기록되지 않은 채 끝난 경우를 위해 reset_timeout이 지나면 다시 허용
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # 시험 요청이 실패하면 임계값과 관계없이 다시 연다
+            if self._probe_started is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+
+class ServiceClient:
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+    RETRY_STATUSES = frozenset([502, 503, 504])
+
+    def __init__(self, name, base_url, pool_size=4, connect_timeout=1.0,
+                 read_timeout=5.0, max_retries=2, backoff=0.05,
+                 retry_budget=None, breaker=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        # metrics.instrument_client가 설정: 호출별 시간 기록, 요청마다 붙일 헤더(X-Request-ID)
+        self.observer = None
+        self.header_factory = None
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # gunicorn fork 이후 부모 프로세스의 커넥션을 공유하지 않도록 프로세스별로 생성
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.pool_size,
+                        pool_block=False
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._pid = os.getpid()
+        return self._session
+
+    def reset(self):
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+    def request(self, method, path, **kwargs):
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout)
+        url = f'{self.base_url}{path}'
+        retryable = method in self.IDEMPOTENT_METHODS
+        if self.header_factory:
+            kwargs['headers'] = {**self.header_factory(), **(kwargs.get('headers') or {})}
+        self.retry_budget.record_request()
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                self._observe(method, 'circuit_open', 0.0)
+                raise CircuitOpenError(f'{self.name} circuit is open')
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._observe(method, 'error', time.perf_counter() - started)
+                self.breaker.record_failure()
+                if self._should_retry(retryable, attempt):
+                    attempt += 1
+                    continue
+                raise
+
+            self._observe(method, f'{response.status_code // 100}xx', time.perf_counter() - started)
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+                if response.status_code in self.RETRY_STATUSES and self._should_retry(retryable, attempt):
+                    response.close()
+                    attempt += 1
+                    continue
+            else:
+                self.breaker.record_success()
+            return response
+
+    def _observe(self, method, outcome, elapsed):
+        if self.observer:
+            self.observer(self.name, method, outcome, elapsed)
+
+    def _should_retry(self, retryable, attempt):
+        if not retryable or attempt >= self.max_retries:
+            return False
+        if not self.retry_budget.try_acquire():
+            return False
+        time.sleep(self.backoff * (2 ** attempt))
+        return True
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+
+def client_from_env(name, base_url, prefix):
+    # 업스트림별 설정(예: FILE_SERVICE_READ_TIMEOUT)이 없으면 UPSTREAM_* 공통 설정을 사용
+    def env(key, default):
+        return os.environ.get(f'{prefix}_{key}', os.environ.get(f'UPSTREAM_{key}', default))
+
+    # 풀 크기는 워커당 동시 처리 수(스레드 수)에 맞춘다
+    default_pool = os.environ.get('GUNICORN_THREADS', 4)
+    return ServiceClient(
+        name,
+        base_url,
+        pool_size=int(env('POOL_SIZE', default_pool)),
+        connect_timeout=float(env('CONNECT_TIMEOUT', 1.0)),
+        read_timeout=float(env('READ_TIMEOUT', 5.0)),
+        max_retries=int(env('MAX_RETRIES', 2)),
+        retry_budget=RetryBudget(ratio=float(env('RETRY_BUDGET_RATIO', 0.2))),
+        breaker=CircuitBreaker(
+            failure_threshold=int(env('BREAKER_THRESHOLD', 5)),
+            reset_timeout=float(env('BREAKER_RESET', 30))
+        )
+    )
@@ -0,0 +1,67 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+
+class S3ClientFactory:
+    # 워커 프로세스마다 S3 클라이언트를 한 번만 만들어 재사용 (fork 이후에는 새로 생성)
+    def __init__(self, config, on_create=None):
+        self.config = config
+        self.on_create = on_create  # 새 클라이언트를 만들 때 호출 (메트릭 등록 등)
+        self.created_count = 0
+        self._clients = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _boto_config(self):
+        return BotoConfig(
+            max_pool_connections=self.config['S3_MAX_POOL_CONNECTIONS'],
+            connect_timeout=self.config['S3_CONNECT_TIMEOUT'],
+            read_timeout=self.config['S3_READ_TIMEOUT'],
+            tcp_keepalive=self.config['S3_TCP_KEEPALIVE'],
+            retries={
+                'mode': self.config['S3_RETRY_MODE'],
+                'max_attempts': self.config['S3_MAX_ATTEMPTS']
+            }
+        )
+
+    def _create(self, public):
+        endpoint_url = self.config['S3_ENDPOINT_URL']
+        # presigned URL은 브라우저가 접근하는 주소로 서명해야 함
+        if public and self.config['S3_PUBLIC_ENDPOINT_URL']:
+            endpoint_url = self.config['S3_PUBLIC_ENDPOINT_URL']
+        # boto3 기본 세션은 스레드 안전하지 않으므로 클라이언트마다 세션을 따로 만든다
+        session = boto3.session.Session(
+            aws_access_key_id=self.config['AWS_ACCESS_KEY_ID'],
+            aws_secret_access_key=self.config['AWS_SECRET_ACCESS_KEY'],
+            region_name=self.config['AWS_DEFAULT_REGION']
+        )
+        kwargs = {'config': self._boto_config()}
+        if endpoint_url:
+            # MinIO 등 다른 S3 호환 서비스 사용
+            kwargs['endpoint_url'] = endpoint_url
+        client = session.client('s3', **kwargs)
+        self.created_count += 1
+        if self.on_create:
+            self.on_create(client)
+        return client
+
+    def get(self, public=False):
+        pid = os.getpid()
+        client = self._clients.get(public) if self._pid == pid else None
+        if client is not None:
+            return client
+        with self._lock:
+            if self._pid != pid:
+                self._clients = {}
+                self._pid = pid
+            if public not in self._clients:
+                self._clients[public] = self._create(public)
+            return self._clients[public]
+
+    def reset(self):
+        with self._lock:
+            self._clients = {}
+            self._pid = None
@@ -0,0 +1,190 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from models import db, Blob, StoredFile
+from pipeline import db_now
+
+
+class PostRefsUnavailable(Exception):
+    pass
+
+
+class RateLimiter:
+    # 초당 rate개를 넘지 않도록 호출 사이를 벌린다 (0이면 제한 없음)
+    def __init__(self, rate):
+        self.rate = rate
+        self._next = time.monotonic()
+
+    def wait(self, count=1):
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+        self._next = max(self._next, now) + count / self.rate
+
+
+class OrphanSweeper:
+    # 게시글이 참조하지 않는 첨부파일을 찾아 지운다
+    #  1) files 테이블(중복 제거 업로드): 게시글 참조가 없으면 참조 해제 → 마지막 참조면 blob도 삭제
+    #  2) 버킷 목록(페이지 단위): uploads/<file_id> 객체(presigned/이전 업로드)와
+    #     file_blobs 행이 없는 uploads/sha256/ 객체를 일괄 delete_objects
+    # grace 기간보다 최근 객체는 글 작성 중일 수 있으므로 건드리지 않는다.
+    def __init__(self, s3_clients, blob_store, post_service, config, logger,
+                 grace=timedelta(hours=24), page_size=1000, deletes_per_second=50,
+                 refs_batch_size=500, max_deletes=0, dry_run=True, internal_token=None):
+        self.s3_clients = s3_clients
+        self.blob_store = blob_store
+        self.post_service = post_service
+        self.bucket = config['S3_BUCKET_NAME']
+        self.prefix = config['S3_UPLOADS_PATH'].rstrip('/') + '/'
+        self.variants = list(config['IMAGE_VARIANTS'])
+        self.logger = logger
+        self.grace = grace
+        self.page_size = page_size
+        self.refs_batch_size = refs_batch_size
+        self.limiter = RateLimiter(deletes_per_second)
+        self.max_deletes = max_deletes
+        self.dry_run = dry_run
+        self.internal_token = internal_token
+        self.report = Counter()
+        self.samples = []
+
+    def run(self):
+        started = time.monotonic()
+        # S3 LastModified는 UTC, files.created_at은 DB 타임존(예: KST)이므로 기준 시각을 따로 잡는다
+        self.cutoff = datetime.now(timezone.utc) - self.grace
+        self.file_cutoff = db_now() - self.grace
+        self.sweep_files()
+        self.sweep_bucket()
+        self.report['elapsed_seconds'] = round(time.monotonic() - started, 1)
+        return {'dry_run': self.dry_run, 'counts': dict(self.report), 'samples': self.samples[:20]}
+
+    def _budget_left(self):
+        return not self.max_deletes or self.report['deleted'] < self.max_deletes
+
+    def referenced(self, file_ids):
+        # post-service의 posts.file_id 인덱스로 묶음 단위 확인
+        headers = {'X-Internal-Token': self.internal_token} if self.internal_token else {}
+        referenced = set()
+        for start in range(0, len(file_ids), self.refs_batch_size):
+            batch = file_ids[start:start + self.refs_batch_size]
+            response = self.post_service.post(
+                '/internal/posts/file-refs', json={'file_ids': batch}, headers=headers
+            )
+            if response.status_code != 200:
+                # 참조 여부를 확인할 수 없으면 아무것도 지우지 않는다
+                raise PostRefsUnavailable(f'post-service returned {response.status_code}')
+            referenced.update(response.json().get('referenced', []))
+        return referenced
+
+    def _record(self, kind, key, size=0):
+        self.report[f'orphan_{kind}'] += 1
+        self.report['orphan_bytes'] += size
+        if len(self.samples) < 100:
+            self.samples.append({'kind': kind, 'key': key, 'size': size})
+
+    def sweep_files(self):
+        cutoff = self.file_cutoff
+        last_file_id = ''
+        while self._budget_left():
+            rows = db.session.query(StoredFile.file_id, StoredFile.created_at, Blob.size) \
+                .join(Blob, Blob.sha256 == StoredFile.blob_sha256) \
+                .filter(StoredFile.file_id > last_file_id) \
+                .order_by(StoredFile.file_id) \
+                .limit(self.page_size) \
+                .all()
+            db.session.rollback()
+            if not rows:
+                break
+            last_file_id = rows[-1].file_id
+            self.report['files_scanned'] += len(rows)
+
+            candidates = [row for row in rows if row.created_at and row.created_at < cutoff]
+            if not candidates:
+                continue
+            referenced = self.referenced([row.file_id for row in candidates])
+            for row in candidates:
+                if row.file_id in referenced or not self._budget_left():
+                    continue
+                self._record('file_ref', row.file_id, row.size)
+                if not self.dry_run:
+                    self.limiter.wait()
+                    self.blob_store.release(row.file_id)
+                    self.report['deleted'] += 1
+
+    def _base_key(self, key):
+        for variant in self.variants:
+            if key.endswith(f'.{variant}'):
+                return key[:-len(variant) - 1]
+        return key
+
+    def sweep_bucket(self):
+        paginator = self.s3_clients.get().get_paginator('list_objects_v2')
+        pages = paginator.paginate(
+            Bucket=self.bucket, Prefix=self.prefix, PaginationConfig={'PageSize': self.page_size}
+        )
+        for page in pages:
+            if not self._budget_left():
+                break
+            objects = [obj for obj in page.get('Contents', []) if obj['LastModified'] < self.cutoff]
+            self.report['objects_scanned'] += page.get('KeyCount', 0)
+            orphans = self._blob_orphans(objects) + self._legacy_orphans(objects)
+            self._delete(orphans)
+
+    def _blob_orphans(self, objects):
+        # uploads/sha256/xx/<hash>[.variant] 중 file_blobs 행이 없는 객체
+        blob_prefix = f'{self.prefix}sha256/'
+        by_hash = {}
+        for obj in objects:
+            if obj['Key'].startswith(blob_prefix):
+                sha256 = self._base_key(obj['Key']).rsplit('/', 1)[-1]
+                by_hash.setdefault(sha256, []).append(obj)
+        if not by_hash:
+            return []
+        known = {row.sha256 for row in db.session.query(Blob.sha256).filter(Blob.sha256.in_(list(by_hash)))}
+        db.session.rollback()
+        return [
+            ('blob_object', obj) for sha256, objs in by_hash.items() if sha256 not in known for obj in objs
+        ]
+
+    def _legacy_orphans(self, objects):
+        # uploads/<file_id>[.variant]: presigned 업로드와 중복 제거 이전 업로드
+        by_file_id = {}
+        for obj in objects:
+            relative = obj['Key'][len(self.prefix):]
+            if '/' in relative:
+                continue
+            by_file_id.setdefault(self._base_key(relative), []).append(obj)
+        if not by_file_id:
+            return []
+        referenced = self.referenced(list(by_file_id))
+        return [
+            ('legacy_object', obj)
+            for file_id, objs in by_file_id.items() if file_id not in referenced for obj in objs
+        ]
+
+    def _delete(self, orphans):
+        keys = []
+        for kind, obj in orphans:
+            if not self._budget_left() or (self.max_deletes and len(keys) + self.report['deleted'] >= self.max_deletes):
+                break
+            self._record(kind, obj['Key'], obj['Size'])
+            keys.append(obj['Key'])
+        if self.dry_run or not keys:
+            return
+        s3_client = self.s3_clients.get()
+        # delete_objects는 요청당 최대 1000개
+        for start in range(0, len(keys), 1000):
+            batch = keys[start:start + 1000]
+            self.limiter.wait(len(batch))
+            response = s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+            errors = response.get('Errors', [])
+            for error in errors:
+                self.logger.warning(f"객체 삭제 실패 {error.get('Key')}: {error.get('Code')}")
+            self.report['deleted'] += len(batch) - len(errors)
+            self.report['delete_errors'] += len(errors)
@@ -0,0 +1,56 @@
+# 실행: cd file-service && python -m pytest tests
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sweeper  # noqa: E402
+from models import db, Blob, StoredFile  # noqa: E402
+
+# DB 시계를 KST(+09:00)로 고정: 같은 순간의 UTC는 2026-10-17 09:00
+DB_NOW = datetime(2026, 10, 17, 18, 0)
+CONFIG = {'S3_BUCKET_NAME': 'test', 'S3_UPLOADS_PATH': 'uploads', 'IMAGE_VARIANTS': {'thumb': 320}}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def add_file(file_id, created_at):
+    db.session.add(Blob(sha256=file_id, s3_key=f'uploads/sha256/{file_id}', size=1, ref_count=1))
+    db.session.add(StoredFile(
+        file_id=file_id, blob_sha256=file_id, original_name=file_id,
+        content_type='text/plain', created_at=created_at
+    ))
+    db.session.commit()
+
+
+def test_file_cutoff_uses_db_clock(app, monkeypatch):
+    monkeypatch.setattr(sweeper, 'db_now', lambda: DB_NOW)
+    add_file('old', DB_NOW - timedelta(hours=25))
+    add_file('recent', DB_NOW - timedelta(hours=23))
+
+    orphan_sweeper = sweeper.OrphanSweeper(
+        None, None, None, CONFIG, logging.getLogger(__name__), grace=timedelta(hours=24)
+    )
+    monkeypatch.setattr(orphan_sweeper, 'referenced', lambda file_ids: set())
+    monkeypatch.setattr(orphan_sweeper, 'sweep_bucket', lambda: None)
+    report = orphan_sweeper.run()
+
+    # UTC 기준으로 자르면 25시간 전(KST) 파일도 아직 grace 안으로 보여 남는다
+    assert orphan_sweeper.file_cutoff == DB_NOW - timedelta(hours=24)
+    assert [sample['key'] for sample in report['samples']] == ['old']
+    assert report['counts']['files_scanned'] == 2
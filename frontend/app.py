@@ -1,61 +1,144 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
-import requests
-import os
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session, jsonify
+from markupsafe import Markup
+from config import Config
+from auth import TokenVerifier, TokenVerificationUnavailable
+from service_client import client_from_env
+from rendering import FragmentCache, StaticAssets, STATIC_CACHE_CONTROL, is_taggable_page
+import metrics
+import views
 
 app = Flask(__name__)
-app.secret_key = 'frontend-secret-key'
+app.config.from_object(Config)
+metrics.init_app(app, 'frontend')
 
-USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'http://user-service:5001')
-POST_SERVICE_URL = os.environ.get('POST_SERVICE_URL', 'http://post-service:5002')
-FILE_SERVICE_URL = os.environ.get('FILE_SERVICE_URL', 'http://file-service:5003')
+# 업스트림별 keep-alive 커넥션 풀 (타임아웃/재시도/서킷 브레이커 포함)
+user_service = client_from_env('user-service', app.config['USER_SERVICE_URL'], 'USER_SERVICE')
+post_service = client_from_env('post-service', app.config['POST_SERVICE_URL'], 'POST_SERVICE')
+file_service = client_from_env('file-service', app.config['FILE_SERVICE_URL'], 'FILE_SERVICE')
+for client in (user_service, post_service, file_service):
+    metrics.instrument_client(client)
+
+token_verifier = TokenVerifier(
+    secret_key=app.config['JWT_SECRET_KEY'],
+    public_key=app.config['JWT_PUBLIC_KEY'],
+    algorithm=app.config['JWT_ALGORITHM'],
+    user_service=user_service,
+    cache_ttl=app.config['TOKEN_CACHE_TTL']
+)
+
+fragment_cache = FragmentCache(
+    ttl=app.config['FRAGMENT_CACHE_TTL'],
+    maxsize=app.config['FRAGMENT_CACHE_SIZE']
+)
+static_assets = StaticAssets(app.static_folder, check_mtime=app.config['STATIC_CHECK_MTIME'])
+
+def asset_url(filename):
+    return url_for('static', filename=filename, v=static_assets.fingerprint(filename))
+
+@app.context_processor
+def inject_upload_mode():
+    return {'presigned_upload': app.config['FILE_PRESIGNED_MODE'], 'asset_url': asset_url}
+
+@app.after_request
+def add_cache_validators(response):
+    if request.endpoint == 'static':
+        # 해시가 붙은 URL은 내용이 바뀌지 않으므로 오래 캐시
+        if static_assets.is_current(request.view_args.get('filename', ''), request.args.get('v')):
+            response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+        return response
+    if not is_taggable_page(request, response):
+        return response
+    headers = views.not_modified_headers(response, response.get_data(), session, request)
+    if headers is not None:
+        return Response(status=304, headers=headers)
+    return response
+
+def render_fragment(template, post):
+    is_owner = views.is_owner(session, post)
+    key = fragment_cache.key(template, post, is_owner)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(render_template(template, post=post, is_owner=is_owner))
+        fragment_cache.set(key, html)
+    return html
+
+def render_post_list(template, posts_data, **context):
+    post_cards = [render_fragment('_post_card.html', post) for post in posts_data.get('posts', [])]
+    return render_template(template, posts_data=posts_data, post_cards=post_cards, **context)
 
 @app.before_request
 def ensure_session_token_valid():
+    # Static assets never need the session check
+    if request.endpoint in ('static',) or 'access_token' not in session:
+        return
     try:
-        if 'access_token' in session:
-            headers = {'Authorization': f"Bearer {session['access_token']}"}
-            resp = requests.post(f"{USER_SERVICE_URL}/verify", headers=headers, timeout=2)
-            if resp.status_code != 200 or not resp.json().get('valid'):
-                session.clear()
-                # Avoid flashing during static asset requests
-                if request.endpoint not in ('static',):
-                    flash('세션이 만료되어 자동으로 로그아웃되었습니다.')
-    except Exception:
+        if not token_verifier.verify(session['access_token']):
+            session.clear()
+            flash('세션이 만료되어 자동으로 로그아웃되었습니다.')
+    except TokenVerificationUnavailable:
         # On verification errors (network, etc.), do not force logout
         pass
 
+def consistency_headers():
+    return views.consistency_headers(app.config, session)
+
+# user-service가 사용자 변경/삭제 시 호출하는 캐시 무효화 훅
+@app.route('/internal/auth/invalidate', methods=['POST'])
+def invalidate_user_cache():
+    if not views.is_internal_request(app.config, request.headers):
+        return jsonify(views.FORBIDDEN), 403
+    data = request.get_json(silent=True) or {}
+    token_verifier.invalidate(data.get('user_id'))
+    return jsonify({'message': 'invalidated'}), 200
+
 @app.route('/')
 def index():
     try:
-        page = request.args.get('page', 1, type=int)
-        response = requests.get(f'{POST_SERVICE_URL}/posts?page={page}&per_page=10')
-        if response.status_code == 200:
-            posts_data = response.json()
-        else:
-            posts_data = {'posts': [], 'pages': 0, 'current_page': 1}
-        
-        return render_template('index.html', posts_data=posts_data)
+        path, params, fallback, message = views.list_request(request.args)
+        response = post_service.get(path, params=params, headers=consistency_headers())
+        posts_data, error = views.posts_data_from(response, fallback, message)
+        if error:
+            flash(error)
+        return render_post_list('index.html', posts_data)
     except Exception as e:
         flash(f'오류가 발생했습니다!: {str(e)}')
-        return render_template('index.html', posts_data={'posts': [], 'pages': 0, 'current_page': 1})
+        return render_post_list('index.html', views.EMPTY_LIST)
+
+@app.route('/users/<int:user_id>/posts')
+def user_posts(user_id):
+    try:
+        path, params = views.author_list_request(user_id, request.args)
+        response = post_service.get(path, params=params, headers=consistency_headers())
+        posts_data, error = views.posts_data_from(
+            response, views.EMPTY_AUTHOR_LIST, '게시글을 불러오지 못했습니다.'
+        )
+        if error:
+            flash(error)
+    except Exception as e:
+        flash(f'오류가 발생했습니다: {str(e)}')
+        posts_data = views.EMPTY_AUTHOR_LIST
+    return render_post_list(
+        'user_posts.html', posts_data, author_id=user_id, first_page=not request.args.get('cursor')
+    )
+
+# 새 글 알림 스트림. 운영에서는 nginx가 post-service로 직접 연결하므로 여기까지 오지 않는다.
+# 동기 워커로 중계하면 연결마다 워커를 점유하므로 204로 응답해 브라우저가 재연결하지 않게 한다
+# (중계가 필요하면 ASGI 게이트웨이 사용).
+@app.route('/events')
+def post_events():
+    return Response(status=204)
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
-        
         try:
-            response = requests.post(f'{USER_SERVICE_URL}/register', json={
-                'username': username,
-                'password': password
-            })
-            
-            if response.status_code == 201:
-                flash('회원가입이 완료되었습니다. 로그인해주세요.')
+            response = user_service.post(
+                '/register', json=views.credentials(request.form), headers=views.client_ip_headers(request)
+            )
+            registered, message = views.register_result(response)
+            flash(message)
+            if registered:
                 return redirect(url_for('login'))
-            else:
-                flash(response.json().get('error', '회원가입에 실패했습니다.'))
         except Exception as e:
             flash(f'오류가 발생했습니다: {str(e)}')
     
@@ -64,24 +147,16 @@ def register():
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
-        
         try:
-            response = requests.post(f'{USER_SERVICE_URL}/login', json={
-                'username': username,
-                'password': password
-            })
-            
-            if response.status_code == 200:
-                data = response.json()
-                session['access_token'] = data['access_token']
-                session['user_id'] = data['user_id']
-                session['username'] = data['username']
-                flash('로그인되었습니다. 이것은 CICD 테스트입니다.')
+            response = user_service.post(
+                '/login', json=views.credentials(request.form), headers=views.client_ip_headers(request)
+            )
+            values, message = views.login_result(response)
+            if values:
+                session.update(values)
+            flash(message)
+            if values:
                 return redirect(url_for('index'))
-            else:
-                flash(response.json().get('error', '로그인에 실패했습니다.'))
         except Exception as e:
             flash(f'오류가 발생했습니다: {str(e)}')
     
@@ -93,62 +168,69 @@ def logout():
     flash('로그아웃되었습니다.')
     return redirect(url_for('index'))
 
+def upload_attachment():
+    # (file_id, 파일 이름). 첨부가 없으면 (None, None), 업로드에 실패하면 None
+    presigned = views.presigned_upload(app.config, request.form)
+    if presigned:
+        # presigned 모드: 브라우저가 S3에 올린 파일의 검사/승격을 요청 (끝날 때까지 기다리지 않음)
+        response = file_service.post(f'/uploads/{presigned[0]}/complete')
+        return presigned if views.upload_completed(response) else None
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return None, None
+    # multipart로 다시 인코딩하지 않고 본문을 그대로 스트리밍
+    response = file_service.post(
+        '/upload', data=file.stream,
+        **views.upload_request(file, app.config['UPLOAD_TIMEOUT'], file_service.timeout[0])
+    )
+    return views.uploaded_file(response)
+
 @app.route('/write', methods=['GET', 'POST'])
 def write():
     if 'access_token' not in session:
-        flash('로그인이 필요합니다.')
+        flash(views.LOGIN_REQUIRED)
         return redirect(url_for('login'))
     
     if request.method == 'POST':
-        title = request.form['title']
-        content = request.form['content']
-        
-        file_id = None
-        file_name = None
-        
         try:
-            # 파일이 제공된 경우에만 업로드 처리
-            if 'file' in request.files:
-                file = request.files['file']
-                if file and file.filename:
-                    files = {'file': (file.filename, file.stream, file.mimetype)}
-                    file_response = requests.post(f'{FILE_SERVICE_URL}/upload', files=files)
-                    if file_response.status_code == 200:
-                        file_data = file_response.json()
-                        file_id = file_data.get('file_id')
-                        file_name = file_data.get('original_name')
-                    else:
-                        flash('파일 업로드에 실패했습니다.')
-                        return render_template('write.html')
-            
-            # 게시글 작성
-            headers = {'Authorization': f"Bearer {session['access_token']}"}
-            post_data = {
-                'title': title,
-                'content': content,
-                'file_id': file_id,
-                'file_name': file_name
-            }
+            attachment = upload_attachment()
+            if attachment is None:
+                flash(views.UPLOAD_FAILED)
+                return render_template('write.html')
             
-            response = requests.post(f'{POST_SERVICE_URL}/posts', json=post_data, headers=headers)
-            
-            if response.status_code == 201:
-                flash('게시글이 작성되었습니다.')
+            response = post_service.post(
+                '/posts', json=views.post_payload(request.form, *attachment), headers=views.auth_headers(session)
+            )
+            created, message = views.write_result(response)
+            if created:
+                views.record_write(session)
+            flash(message)
+            if created:
                 return redirect(url_for('index'))
-            else:
-                flash(response.json().get('error', '게시글 작성에 실패했습니다.'))
         except Exception as e:
             flash(f'오류가 발생했습니다: {str(e)}')
     
     return render_template('write.html')
 
+@app.route('/upload-url', methods=['POST'])
+def upload_url():
+    if 'access_token' not in session:
+        return jsonify({'error': views.LOGIN_REQUIRED}), 401
+    if not app.config['FILE_PRESIGNED_MODE']:
+        return jsonify(views.PRESIGNED_DISABLED), 404
+    try:
+        response = file_service.post('/upload-url', json=request.get_json(silent=True) or {})
+        return jsonify(response.json()), response.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 502
+
 @app.route('/post/<int:post_id>')
 def view_post(post_id):
     try:
-        response = requests.get(f'{POST_SERVICE_URL}/posts/{post_id}')
+        response = post_service.get(f'/posts/{post_id}', headers=consistency_headers())
         if response.status_code == 200:
             post = response.json()
-            return render_template('post.html', post=post)
+            return render_template('post.html', post=post, post_body=render_fragment('_post_detail.html', post))
         else:
             flash('게시글을 찾을 수 없습니다.')
             return redirect(url_for('index'))
@@ -159,33 +241,63 @@ def view_post(post_id):
 @app.route('/delete/<int:post_id>')
 def delete_post(post_id):
     if 'access_token' not in session:
-        flash('로그인이 필요합니다.')
+        flash(views.LOGIN_REQUIRED)
         return redirect(url_for('login'))
     
     try:
-        headers = {'Authorization': f"Bearer {session['access_token']}"}
-        response = requests.delete(f'{POST_SERVICE_URL}/posts/{post_id}', headers=headers)
-        
-        if response.status_code == 200:
-            flash('게시글이 삭제되었습니다.')
-        else:
-            flash(response.json().get('error', '게시글 삭제에 실패했습니다.'))
+        response = post_service.delete(f'/posts/{post_id}', headers=views.auth_headers(session))
+        deleted, message = views.delete_result(response)
+        if deleted:
+            views.record_write(session)
+        flash(message)
     except Exception as e:
         flash(f'오류가 발생했습니다: {str(e)}')
     
     return redirect(url_for('index'))
 
+def stream_upstream(response, chunk_size=64 * 1024):
+    try:
+        for chunk in response.iter_content(chunk_size):
+            yield chunk
+    finally:
+        response.close()
+
 @app.route('/download/<file_id>')
 def download_file(file_id):
     try:
-        response = requests.get(f'{FILE_SERVICE_URL}/download/{file_id}', stream=True)
-        if response.status_code == 200:
-            return response.content, 200, {
-                'Content-Type': response.headers.get('Content-Type', 'application/octet-stream'),
-                'Content-Disposition': response.headers.get('Content-Disposition', f'attachment; filename="{file_id}"')
-            }
+        params = views.download_params(request.args)
+        if app.config['FILE_PRESIGNED_MODE']:
+            # file-service가 발급한 presigned GET 주소로 바로 보냄
+            response = file_service.get(
+                f'/download/{file_id}',
+                params=dict(params, redirect='1'),
+                allow_redirects=False
+            )
+            location = views.presigned_location(response)
+            if location:
+                return redirect(location)
+            flash(views.download_error_message(response.status_code))
+            return redirect(url_for('index'))
+
+        response = file_service.get(
+            f'/download/{file_id}', params=params, stream=True, headers=views.forward_headers(request)
+        )
+        if response.status_code == 304:
+            response.close()
+            return Response(status=304, headers=views.passthrough_headers(response))
+        elif response.status_code in (200, 206):
+            return Response(
+                stream_upstream(response),
+                status=response.status_code,
+                headers=views.download_headers(response, file_id),
+                direct_passthrough=True
+            )
+        elif response.status_code == 416:
+            response.close()
+            return jsonify(views.INVALID_RANGE), 416
         else:
-            flash('파일을 찾을 수 없습니다.')
+            response.close()
+            flash(views.download_error_message(response.status_code))
             return redirect(url_for('index'))
     except Exception as e:
         flash(f'오류가 발생했습니다: {str(e)}')
@@ -0,0 +1,406 @@
+# 비동기(ASGI) 프론트엔드 게이트웨이
+#   gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+# app.py(Flask)와 같은 라우트/템플릿과 요청/응답 처리(views.py)를 사용하되, 세션 토큰 확인과 페이지 데이터 조회를 동시에 수행한다.
+import asyncio
+
+import httpx
+from markupsafe import Markup
+from quart import Quart, Response, render_template, request, redirect, url_for, flash, session, jsonify, g
+
+from config import Config
+from auth import TokenVerifier, TokenVerificationUnavailable, MISSING
+from async_client import async_client_from_env
+from service_client import CircuitOpenError
+from rendering import FragmentCache, StaticAssets, STATIC_CACHE_CONTROL, is_taggable_page
+import metrics
+import views
+
+app = Quart(__name__)
+app.config.from_object(Config)
+
+user_service = async_client_from_env('user-service', app.config['USER_SERVICE_URL'], 'USER_SERVICE')
+post_service = async_client_from_env('post-service', app.config['POST_SERVICE_URL'], 'POST_SERVICE')
+file_service = async_client_from_env('file-service', app.config['FILE_SERVICE_URL'], 'FILE_SERVICE')
+metrics.init_async_app(app, 'frontend', clients=(user_service, post_service, file_service))
+
+token_verifier = TokenVerifier(
+    secret_key=app.config['JWT_SECRET_KEY'],
+    public_key=app.config['JWT_PUBLIC_KEY'],
+    algorithm=app.config['JWT_ALGORITHM'],
+    cache_ttl=app.config['TOKEN_CACHE_TTL']
+)
+
+UPSTREAM_ERRORS = (httpx.HTTPError, CircuitOpenError)
+
+# SSE 중계 전용 클라이언트: 연결이 오래 유지되므로 일반 요청용 풀/동시성 제한과 분리
+events_client = None
+
+def get_events_client():
+    global events_client
+    if events_client is None:
+        limit = app.config['EVENTS_RELAY_MAX_CONNECTIONS']
+        events_client = httpx.AsyncClient(
+            base_url=app.config['POST_SERVICE_URL'],
+            timeout=httpx.Timeout(None, connect=post_service.timeout[0]),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=0)
+        )
+    return events_client
+
+@app.after_serving
+async def close_upstreams():
+    for client in (user_service, post_service, file_service):
+        await client.aclose()
+    if events_client is not None:
+        await events_client.aclose()
+
+fragment_cache = FragmentCache(
+    ttl=app.config['FRAGMENT_CACHE_TTL'],
+    maxsize=app.config['FRAGMENT_CACHE_SIZE']
+)
+static_assets = StaticAssets(app.static_folder, check_mtime=app.config['STATIC_CHECK_MTIME'])
+
+def asset_url(filename):
+    return url_for('static', filename=filename, v=static_assets.fingerprint(filename))
+
+@app.context_processor
+async def inject_upload_mode():
+    return {'presigned_upload': app.config['FILE_PRESIGNED_MODE'], 'asset_url': asset_url}
+
+@app.after_request
+async def add_cache_validators(response):
+    if request.endpoint == 'static':
+        # 해시가 붙은 URL은 내용이 바뀌지 않으므로 오래 캐시
+        if static_assets.is_current(request.view_args.get('filename', ''), request.args.get('v')):
+            response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+        return response
+    if not is_taggable_page(request, response):
+        return response
+    headers = views.not_modified_headers(response, await response.get_data(), session, request)
+    if headers is not None:
+        return Response('', status=304, headers=headers)
+    return response
+
+async def verify_token(token):
+    claims, user_info = token_verifier.check_local(token)
+    if claims is None:
+        return None
+    if user_info is MISSING:
+        try:
+            response = await user_service.post(
+                '/verify',
+                headers={'Authorization': f'Bearer {token}'},
+                timeout=token_verifier.remote_timeout
+            )
+        except UPSTREAM_ERRORS as e:
+            raise TokenVerificationUnavailable(str(e))
+        if response.status_code == 200:
+            data = response.json()
+            user_info = data if data.get('valid') else None
+        elif response.status_code in (401, 404, 422):
+            user_info = None
+        else:
+            raise TokenVerificationUnavailable(f'unexpected status {response.status_code}')
+        token_verifier.remember(claims, user_info)
+    return token_verifier.result(claims, user_info)
+
+@app.before_request
+async def start_session_check():
+    # 토큰 확인을 백그라운드로 시작하고, 라우트는 그동안 업스트림 데이터를 가져온다
+    if request.endpoint not in ('static',) and 'access_token' in session:
+        g.session_check = asyncio.ensure_future(verify_token(session['access_token']))
+
+async def ensure_session_token_valid():
+    task = g.pop('session_check', None)
+    if task is None:
+        return
+    try:
+        if not await task:
+            session.clear()
+            await flash('세션이 만료되어 자동으로 로그아웃되었습니다.')
+    except TokenVerificationUnavailable:
+        # On verification errors (network, etc.), do not force logout
+        pass
+
+@app.after_request
+async def finish_session_check(response):
+    await ensure_session_token_valid()
+    return response
+
+async def render(template, **context):
+    await ensure_session_token_valid()
+    return await render_template(template, **context)
+
+async def render_fragment(template, post):
+    # 세션 확인(render/render_post_list)이 끝난 뒤 호출해야 작성자 여부가 정확하다
+    is_owner = views.is_owner(session, post)
+    key = fragment_cache.key(template, post, is_owner)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(await render_template(template, post=post, is_owner=is_owner))
+        fragment_cache.set(key, html)
+    return html
+
+async def render_post_list(template, posts_data, **context):
+    await ensure_session_token_valid()
+    post_cards = [await render_fragment('_post_card.html', post) for post in posts_data.get('posts', [])]
+    return await render_template(template, posts_data=posts_data, post_cards=post_cards, **context)
+
+async def require_login():
+    await ensure_session_token_valid()
+    return 'access_token' in session
+
+def consistency_headers():
+    return views.consistency_headers(app.config, session)
+
+# user-service가 사용자 변경/삭제 시 호출하는 캐시 무효화 훅
+@app.route('/internal/auth/invalidate', methods=['POST'])
+async def invalidate_user_cache():
+    if not views.is_internal_request(app.config, request.headers):
+        return jsonify(views.FORBIDDEN), 403
+    data = await request.get_json(silent=True) or {}
+    token_verifier.invalidate(data.get('user_id'))
+    return jsonify({'message': 'invalidated'}), 200
+
+@app.route('/')
+async def index():
+    try:
+        path, params, fallback, message = views.list_request(request.args)
+        response = await post_service.get(path, params=params, headers=consistency_headers())
+        posts_data, error = views.posts_data_from(response, fallback, message)
+        if error:
+            await flash(error)
+        return await render_post_list('index.html', posts_data)
+    except Exception as e:
+        await flash(f'오류가 발생했습니다!: {str(e)}')
+        return await render_post_list('index.html', views.EMPTY_LIST)
+
+@app.route('/users/<int:user_id>/posts')
+async def user_posts(user_id):
+    try:
+        path, params = views.author_list_request(user_id, request.args)
+        response = await post_service.get(path, params=params, headers=consistency_headers())
+        posts_data, error = views.posts_data_from(
+            response, views.EMPTY_AUTHOR_LIST, '게시글을 불러오지 못했습니다.'
+        )
+        if error:
+            await flash(error)
+    except Exception as e:
+        await flash(f'오류가 발생했습니다: {str(e)}')
+        posts_data = views.EMPTY_AUTHOR_LIST
+    return await render_post_list(
+        'user_posts.html', posts_data, author_id=user_id, first_page=not request.args.get('cursor')
+    )
+
+# 새 글 알림 스트림 중계 (nginx 없이 띄운 경우). 연결당 코루틴 하나라 유휴 연결 비용이 작다.
+@app.route('/events')
+async def post_events():
+    headers = {}
+    if request.headers.get('Last-Event-ID'):
+        headers['Last-Event-ID'] = request.headers['Last-Event-ID']
+    client = get_events_client()
+    try:
+        upstream = await client.send(client.build_request('GET', '/posts/stream', headers=headers), stream=True)
+    except httpx.HTTPError:
+        return Response('', status=503, headers={'Retry-After': '10'})
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        return Response('', status=upstream.status_code, headers={'Retry-After': '10'})
+    # chunk_size=None: 받은 이벤트를 모으지 않고 바로 전달
+    response = Response(
+        stream_upstream(upstream, chunk_size=None),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.timeout = None  # Quart 기본 RESPONSE_TIMEOUT(60초)에 끊기지 않도록
+    return response
+
+@app.route('/register', methods=['GET', 'POST'])
+async def register():
+    if request.method == 'POST':
+        form = await request.form
+        try:
+            response = await user_service.post(
+                '/register', json=views.credentials(form), headers=views.client_ip_headers(request)
+            )
+            registered, message = views.register_result(response)
+            await flash(message)
+            if registered:
+                return redirect(url_for('login'))
+        except Exception as e:
+            await flash(f'오류가 발생했습니다: {str(e)}')
+
+    return await render('register.html')
+
+@app.route('/login', methods=['GET', 'POST'])
+async def login():
+    if request.method == 'POST':
+        form = await request.form
+        try:
+            response = await user_service.post(
+                '/login', json=views.credentials(form), headers=views.client_ip_headers(request)
+            )
+            values, message = views.login_result(response)
+            if values:
+                # 이전 세션 확인 결과가 새 로그인 세션을 지우지 않도록 먼저 마무리
+                await ensure_session_token_valid()
+                session.update(values)
+            await flash(message)
+            if values:
+                return redirect(url_for('index'))
+        except Exception as e:
+            await flash(f'오류가 발생했습니다: {str(e)}')
+
+    return await render('login.html')
+
+@app.route('/logout')
+async def logout():
+    task = g.pop('session_check', None)
+    if task is not None:
+        task.cancel()
+    session.clear()
+    await flash('로그아웃되었습니다.')
+    return redirect(url_for('index'))
+
+async def iter_file(stream, chunk_size=64 * 1024):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+async def upload_attachment(form, files):
+    # (file_id, 파일 이름). 첨부가 없으면 (None, None), 업로드에 실패하면 None
+    presigned = views.presigned_upload(app.config, form)
+    if presigned:
+        # presigned 모드: 브라우저가 S3에 올린 파일의 검사/승격을 요청 (끝날 때까지 기다리지 않음)
+        response = await file_service.post(f'/uploads/{presigned[0]}/complete')
+        return presigned if views.upload_completed(response) else None
+    file = files.get('file')
+    if not file or not file.filename:
+        return None, None
+    file.stream.seek(0, 2)
+    size = file.stream.tell()
+    file.stream.seek(0)
+    upload = views.upload_request(file, app.config['UPLOAD_TIMEOUT'], file_service.timeout[0])
+    upload['headers']['Content-Length'] = str(size)
+    response = await file_service.post('/upload', content=iter_file(file.stream), **upload)
+    return views.uploaded_file(response)
+
+@app.route('/write', methods=['GET', 'POST'])
+async def write():
+    if not await require_login():
+        await flash(views.LOGIN_REQUIRED)
+        return redirect(url_for('login'))
+
+    if request.method == 'POST':
+        form = await request.form
+        files = await request.files
+        try:
+            attachment = await upload_attachment(form, files)
+            if attachment is None:
+                await flash(views.UPLOAD_FAILED)
+                return await render('write.html')
+
+            response = await post_service.post(
+                '/posts', json=views.post_payload(form, *attachment), headers=views.auth_headers(session)
+            )
+            created, message = views.write_result(response)
+            if created:
+                views.record_write(session)
+            await flash(message)
+            if created:
+                return redirect(url_for('index'))
+        except Exception as e:
+            await flash(f'오류가 발생했습니다: {str(e)}')
+
+    return await render('write.html')
+
+@app.route('/upload-url', methods=['POST'])
+async def upload_url():
+    if not await require_login():
+        return jsonify({'error': views.LOGIN_REQUIRED}), 401
+    if not app.config['FILE_PRESIGNED_MODE']:
+        return jsonify(views.PRESIGNED_DISABLED), 404
+    try:
+        response = await file_service.post('/upload-url', json=await request.get_json(silent=True) or {})
+        return jsonify(response.json()), response.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 502
+
+@app.route('/post/<int:post_id>')
+async def view_post(post_id):
+    try:
+        response = await post_service.get(f'/posts/{post_id}', headers=consistency_headers())
+        if response.status_code == 200:
+            post = response.json()
+            await ensure_session_token_valid()
+            post_body = await render_fragment('_post_detail.html', post)
+            return await render('post.html', post=post, post_body=post_body)
+        else:
+            await flash('게시글을 찾을 수 없습니다.')
+            return redirect(url_for('index'))
+    except Exception as e:
+        await flash(f'오류가 발생했습니다: {str(e)}')
+        return redirect(url_for('index'))
+
+@app.route('/delete/<int:post_id>')
+async def delete_post(post_id):
+    if not await require_login():
+        await flash(views.LOGIN_REQUIRED)
+        return redirect(url_for('login'))
+
+    try:
+        response = await post_service.delete(f'/posts/{post_id}', headers=views.auth_headers(session))
+        deleted, message = views.delete_result(response)
+        if deleted:
+            views.record_write(session)
+        await flash(message)
+    except Exception as e:
+        await flash(f'오류가 발생했습니다: {str(e)}')
+
+    return redirect(url_for('index'))
+
+async def stream_upstream(response, chunk_size=64 * 1024):
+    try:
+        async for chunk in response.aiter_bytes(chunk_size):
+            yield chunk
+    finally:
+        await response.aclose()
+
+@app.route('/download/<file_id>')
+async def download_file(file_id):
+    try:
+        params = views.download_params(request.args)
+        if app.config['FILE_PRESIGNED_MODE']:
+            # file-service가 발급한 presigned GET 주소로 바로 보냄
+            response = await file_service.get(f'/download/{file_id}', params=dict(params, redirect='1'))
+            location = views.presigned_location(response)
+            if location:
+                return redirect(location)
+            await flash(views.download_error_message(response.status_code))
+            return redirect(url_for('index'))
+
+        response = await file_service.get(
+            f'/download/{file_id}', params=params, stream=True, headers=views.forward_headers(request)
+        )
+        if response.status_code == 304:
+            await response.aclose()
+            return Response('', status=304, headers=views.passthrough_headers(response))
+        elif response.status_code in (200, 206):
+            return Response(
+                stream_upstream(response), status=response.status_code,
+                headers=views.download_headers(response, file_id)
+            )
+        elif response.status_code == 416:
+            await response.aclose()
+            return jsonify(views.INVALID_RANGE), 416
+        else:
+            await response.aclose()
+            await flash(views.download_error_message(response.status_code))
+            return redirect(url_for('index'))
+    except Exception as e:
+        await flash(f'오류가 발생했습니다: {str(e)}')
+        return redirect(url_for('index'))
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+from service_client import CircuitBreaker, CircuitOpenError, RetryBudget
+
+
+class AsyncServiceClient:
+    # ServiceClient의 비동기 버전: 업스트림별 동시 요청 수 제한 + 재시도 예산 + 서킷 브레이커
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+    RETRY_STATUSES = frozenset([502, 503, 504])
+
+    def __init__(self, name, base_url, concurrency=32, connect_timeout=1.0,
+                 read_timeout=5.0, max_retries=2, backoff=0.05,
+                 retry_budget=None, breaker=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        # metrics.instrument_client가 설정: 호출별 시간 기록, 요청마다 붙일 헤더(X-Request-ID)
+        self.observer = None
+        self.header_factory = None
+        self._client = None
+        self._semaphore = None
+
+    @property
+    def client(self):
+        # 이벤트 루프가 뜬 뒤(워커 프로세스 안에서) 처음 사용할 때 생성
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    def _timeout(self, timeout):
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        return httpx.Timeout(read, connect=connect)
+
+    async def request(self, method, path, stream=False, timeout=None, **kwargs):
+        method = method.upper()
+        client = self.client
+        retryable = method in self.IDEMPOTENT_METHODS
+        if self.header_factory:
+            kwargs['headers'] = {**self.header_factory(), **(kwargs.get('headers') or {})}
+        self.retry_budget.record_request()
+        request = client.build_request(method, path, timeout=self._timeout(timeout or self.timeout), **kwargs)
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                self._observe(method, 'circuit_open', 0.0)
+                raise CircuitOpenError(f'{self.name} circuit is open')
+            try:
+                # 업스트림당 동시 요청 수를 제한해 느린 업스트림이 전체 워커를 점유하지 않게 함
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    response = await client.send(request, stream=stream)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                self._observe(method, 'error', time.perf_counter() - started)
+                self.breaker.record_failure()
+                if await self._should_retry(retryable, attempt):
+                    attempt += 1
+                    continue
+                raise
+
+            self._observe(method, f'{response.status_code // 100}xx', time.perf_counter() - started)
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+                if response.status_code in self.RETRY_STATUSES and await self._should_retry(retryable, attempt):
+                    await response.aclose()
+                    attempt += 1
+                    continue
+            else:
+                self.breaker.record_success()
+            return response
+
+    def _observe(self, method, outcome, elapsed):
+        if self.observer:
+            self.observer(self.name, method, outcome, elapsed)
+
+    async def _should_retry(self, retryable, attempt):
+        if not retryable or attempt >= self.max_retries:
+            return False
+        if not self.retry_budget.try_acquire():
+            return False
+        await asyncio.sleep(self.backoff * (2 ** attempt))
+        return True
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
+
+
+def async_client_from_env(name, base_url, prefix):
+    # 업스트림별 설정(예: POST_SERVICE_CONCURRENCY)이 없으면 UPSTREAM_* 공통 설정을 사용
+    def env(key, default):
+        return os.environ.get(f'{prefix}_{key}', os.environ.get(f'UPSTREAM_{key}', default))
+
+    return AsyncServiceClient(
+        name,
+        base_url,
+        concurrency=int(env('CONCURRENCY', 32)),
+        connect_timeout=float(env('CONNECT_TIMEOUT', 1.0)),
+        read_timeout=float(env('READ_TIMEOUT', 5.0)),
+        max_retries=int(env('MAX_RETRIES', 2)),
+        retry_budget=RetryBudget(ratio=float(env('RETRY_BUDGET_RATIO', 0.2))),
+        breaker=CircuitBreaker(
+            failure_threshold=int(env('BREAKER_THRESHOLD', 5)),
+            reset_timeout=float(env('BREAKER_RESET', 30))
+        )
+    )
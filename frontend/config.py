@@ -0,0 +1,34 @@
+import os
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'frontend-secret-key'
+    MAX_CONTENT_LENGTH = 20 * 1024 * 1024  # nginx client_max_body_size와 동일
+
+    USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'http://user-service:5001')
+    POST_SERVICE_URL = os.environ.get('POST_SERVICE_URL', 'http://post-service:5002')
+    FILE_SERVICE_URL = os.environ.get('FILE_SERVICE_URL', 'http://file-service:5003')
+    UPLOAD_TIMEOUT = float(os.environ.get('UPLOAD_TIMEOUT', 60))
+
+    # true이면 첨부파일을 브라우저에서 S3로 직접 업로드/다운로드 (file-service presigned URL)
+    FILE_PRESIGNED_MODE = os.environ.get('FILE_PRESIGNED_MODE', 'false').lower() == 'true'
+
+    # JWT 로컬 검증 설정 (user-service와 동일한 키/알고리즘)
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
+    JWT_PUBLIC_KEY = os.environ.get('JWT_PUBLIC_KEY')
+    JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 60))
+    INTERNAL_API_TOKEN = os.environ.get('INTERNAL_API_TOKEN')
+    # 개발용: 토큰이 설정되지 않았을 때 내부 API를 인증 없이 허용 (운영에서는 켜지 말 것)
+    INTERNAL_API_INSECURE = os.environ.get('INTERNAL_API_INSECURE', 'false').lower() == 'true'
+
+    # 글 작성/삭제 직후 이 시간(초) 동안은 post-service에 primary DB 조회를 요청 (read-your-writes)
+    READ_CONSISTENCY_WINDOW = float(os.environ.get('READ_CONSISTENCY_WINDOW', 5))
+
+    # 게시글 카드/본문 HTML 조각 캐시 (게시글 내용이 바뀌면 키가 바뀌므로 TTL은 메모리 회수용)
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 600))
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 5000))
+    # true이면 정적 파일 해시를 요청마다 수정 시각으로 다시 확인 (개발용)
+    STATIC_CHECK_MTIME = os.environ.get('STATIC_CHECK_MTIME', 'false').lower() == 'true'
+
+    # 새 글 알림(SSE). nginx는 /events를 post-service로 직접 보내고, nginx 없이 띄운 ASGI 게이트웨이만 중계한다.
+    EVENTS_RELAY_MAX_CONNECTIONS = int(os.environ.get('EVENTS_RELAY_MAX_CONNECTIONS', 1000))
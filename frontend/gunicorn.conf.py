@@ -0,0 +1,74 @@
+# gunicorn이 작업 디렉터리의 gunicorn.conf.py를 자동으로 읽는다
+# 기본값은 아래 역할별 프로필이며 GUNICORN_* 환경 변수(또는 명령줄 옵션)로 덮어쓸 수 있다.
+#
+# frontend: 업스트림 HTTP 호출을 기다리는 시간이 대부분이므로 gthread 워커에 스레드를 여러 개 둔다.
+# FRONTEND_SERVER_MODE=async 이면 ASGI 게이트웨이(asgi.py)를 uvicorn 워커로 실행한다.
+import os
+import shutil
+
+
+def cpu_count():
+    # 컨테이너 CPU 제한(cgroup v2 cpu.max)이 있으면 그 값을, 없으면 사용 가능한 CPU 수를 쓴다
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+server_mode = os.environ.get('FRONTEND_SERVER_MODE', 'sync')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.environ.get(
+    'GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker' if server_mode == 'async' else 'gthread'
+)
+workers = int(os.environ.get('GUNICORN_WORKERS', max(2, cpu_count())))
+# 업스트림 커넥션 풀 크기(service_client.client_from_env)도 같은 값을 기본으로 쓴다
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# nginx upstream keepalive(기본 60초)보다 길게 유지해 재사용 중 끊기는 경합을 피한다
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 65))
+
+# 마스터에서 앱을 한 번 import하고 fork: 워커끼리 코드/모듈 메모리를 copy-on-write로 공유하고 기동이 빨라진다
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# 요청 수가 쌓이면 워커를 교체해 메모리 증가(단편화, 누수)를 되돌린다. jitter로 동시에 재시작되지 않게 분산
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+wsgi_app = 'asgi:app' if server_mode == 'async' else 'app:app'
+
+
+def on_starting(server):
+    # 이전 실행에서 남은 워커별 메트릭 파일 정리
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # preload로 마스터에서 만든 커넥션/풀을 워커가 그대로 쓰지 않도록 정리 (다음 사용 시 워커에서 새로 생성)
+    # (async 모드의 httpx 클라이언트는 워커의 이벤트 루프 안에서 처음 사용할 때 만들어진다)
+    if not server.cfg.preload_app or server_mode == 'async':
+        return
+    from app import file_service, post_service, user_service
+    for client in (user_service, post_service, file_service):
+        client.reset()
+
+
+def post_worker_init(worker):
+    worker.log.info('Worker ready (pid: %s)', worker.pid)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
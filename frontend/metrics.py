@@ -0,0 +1,238 @@
+# Prometheus 메트릭 (/metrics)
+#   - 라우트별 요청 수/지연시간, 처리 중인 요청 수
+#   - 업스트림(HTTP 서비스, S3) 호출 시간, 요청당 SQL 쿼리 수/시간
+#   - X-Request-ID 발급/전달
+# gunicorn 멀티 워커에서는 PROMETHEUS_MULTIPROC_DIR을 지정해 워커별 값을 합산한다 (gunicorn.conf.py 참고).
+import logging
+import os
+import time
+import uuid
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_COUNT = Counter(
+    'http_requests_total', 'HTTP requests', ['service', 'method', 'endpoint', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['service', 'method', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'HTTP requests in progress', ['service'],
+    multiprocess_mode='livesum'
+)
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Upstream HTTP call latency per attempt',
+    ['service', 'upstream', 'method', 'outcome'], buckets=LATENCY_BUCKETS
+)
+S3_LATENCY = Histogram(
+    's3_request_duration_seconds', 'S3 API call latency', ['service', 'operation', 'outcome'],
+    buckets=LATENCY_BUCKETS
+)
+S3_CLIENTS_CREATED = Counter(
+    's3_clients_created_total', 'S3 clients created', ['service']
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request', ['service', 'endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'db_query_seconds_per_request', 'Total SQL execution time per request', ['service', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+
+logger = logging.getLogger(__name__)
+_service_name = 'app'
+
+
+def current_request_id():
+    if has_request_context():
+        return g.get('request_id')
+    return None
+
+
+def request_id_headers():
+    request_id = current_request_id()
+    return {REQUEST_ID_HEADER: request_id} if request_id else {}
+
+
+def render_metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    return generate_latest(registry)
+
+
+def metrics_response():
+    return Response(render_metrics(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def _endpoint():
+    # URL 대신 라우트 이름을 레이블로 사용해 레이블 수를 제한
+    return request.endpoint or 'unmatched'
+
+
+def init_app(app, service_name, slow_request_seconds=None):
+    global _service_name
+    _service_name = service_name
+    slow_request_seconds = slow_request_seconds or float(os.environ.get('SLOW_REQUEST_SECONDS', 1.0))
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+        REQUESTS_IN_PROGRESS.labels(service_name).inc()
+        g.in_progress_counted = True
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = _endpoint()
+        if endpoint != 'metrics':
+            REQUEST_COUNT.labels(service_name, request.method, endpoint, response.status_code).inc()
+            REQUEST_LATENCY.labels(service_name, request.method, endpoint).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(service_name, endpoint).observe(g.get('db_queries', 0))
+            DB_TIME_PER_REQUEST.labels(service_name, endpoint).observe(g.get('db_time', 0.0))
+        if elapsed >= slow_request_seconds:
+            logger.warning(
+                'slow request %s %s %.3fs status=%s db_queries=%d db_time=%.3fs request_id=%s',
+                request.method, request.path, elapsed, response.status_code,
+                g.get('db_queries', 0), g.get('db_time', 0.0), g.request_id
+            )
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        # 예외로 after_request가 건너뛰어져도 처리 중 요청 수는 되돌린다
+        if g.pop('in_progress_counted', False):
+            REQUESTS_IN_PROGRESS.labels(service_name).dec()
+
+    app.add_url_rule('/metrics', 'metrics', metrics_response)
+
+
+def observe_upstream(upstream, method, outcome, elapsed):
+    UPSTREAM_LATENCY.labels(_service_name, upstream, method, outcome).observe(elapsed)
+
+
+def instrument_client(client, header_factory=request_id_headers):
+    # ServiceClient/AsyncServiceClient 호출 시간 측정 + X-Request-ID 전달
+    client.observer = observe_upstream
+    client.header_factory = header_factory
+    return client
+
+
+def instrument_sqlalchemy():
+    # 모든 엔진(primary/레플리카)의 쿼리를 요청 단위로 집계
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        if has_request_context() and 'db_queries' in g:
+            g.db_queries += 1
+            g.db_time += time.perf_counter() - started
+
+    @event.listens_for(Engine, 'handle_error')
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_started'):
+            connection.info['query_started'].pop()
+
+
+def instrument_s3_client(client):
+    # botocore 이벤트로 S3 API 호출(재시도 포함 전체) 시간을 측정
+    S3_CLIENTS_CREATED.labels(_service_name).inc()
+
+    def before_call(model, context, **kwargs):
+        context['metrics_started'] = time.perf_counter()
+
+    def after_call(model, context, http_response=None, parsed=None, **kwargs):
+        started = context.pop('metrics_started', None)
+        if started is None:
+            return
+        status = getattr(http_response, 'status_code', 0)
+        outcome = 'ok' if status < 400 else str(status)
+        S3_LATENCY.labels(_service_name, model.name, outcome).observe(time.perf_counter() - started)
+
+    def after_call_error(model, context, exception=None, **kwargs):
+        started = context.pop('metrics_started', None)
+        if started is not None:
+            S3_LATENCY.labels(_service_name, model.name, 'error').observe(time.perf_counter() - started)
+
+    client.meta.events.register('before-call.s3', before_call)
+    client.meta.events.register('after-call.s3', after_call)
+    client.meta.events.register('after-call-error.s3', after_call_error)
+    return client
+
+
+def init_async_app(app, service_name, clients=(), slow_request_seconds=None):
+    # asgi.py(Quart)용: 훅을 코루틴으로 등록해 스레드 전환 없이 측정
+    from quart import Response as QuartResponse, g as quart_g, request as quart_request
+    from quart import has_request_context as has_quart_request_context
+
+    global _service_name
+    _service_name = service_name
+    slow_request_seconds = slow_request_seconds or float(os.environ.get('SLOW_REQUEST_SECONDS', 1.0))
+
+    def async_request_id_headers():
+        request_id = quart_g.get('request_id') if has_quart_request_context() else None
+        return {REQUEST_ID_HEADER: request_id} if request_id else {}
+
+    for client in clients:
+        instrument_client(client, header_factory=async_request_id_headers)
+
+    @app.before_request
+    async def start_request_metrics():
+        quart_g.request_id = quart_request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        quart_g.request_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(service_name).inc()
+        quart_g.in_progress_counted = True
+
+    @app.after_request
+    async def record_request_metrics(response):
+        started = quart_g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = quart_request.endpoint or 'unmatched'
+        if endpoint != 'metrics':
+            REQUEST_COUNT.labels(service_name, quart_request.method, endpoint, response.status_code).inc()
+            REQUEST_LATENCY.labels(service_name, quart_request.method, endpoint).observe(elapsed)
+        if elapsed >= slow_request_seconds:
+            logger.warning(
+                'slow request %s %s %.3fs status=%s request_id=%s',
+                quart_request.method, quart_request.path, elapsed, response.status_code, quart_g.request_id
+            )
+        response.headers[REQUEST_ID_HEADER] = quart_g.request_id
+        return response
+
+    @app.teardown_request
+    async def finish_request_metrics(exc):
+        if quart_g.pop('in_progress_counted', False):
+            REQUESTS_IN_PROGRESS.labels(service_name).dec()
+
+    async def metrics():
+        return QuartResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import threading
+
+from cache import TTLCache
+
+STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def post_version(post):
+    # post-service 응답에는 수정 시각이 없으므로 응답 내용 자체를 버전으로 사용
+    # (작성자 이름 정리 등으로 내용이 바뀌면 키도 바뀐다)
+    payload = json.dumps(post, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class FragmentCache:
+    # 게시글 카드/본문처럼 로그인 사용자와 무관한 HTML 조각을 게시글 버전별로 캐시
+    # (작성자 전용 메뉴처럼 보는 사람에 따라 달라지는 부분은 extra로 키에 포함)
+    def __init__(self, ttl=300, maxsize=5000):
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    def key(self, template, post, *extra):
+        parts = [template, str(post.get('id')), post_version(post)] + [str(value) for value in extra]
+        return ':'.join(parts)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, html):
+        self._cache.set(key, html)
+
+
+class StaticAssets:
+    # 정적 파일 내용 해시를 URL(?v=)에 붙여, 내용이 바뀌면 URL도 바뀌게 한다
+    # → 해시가 일치하는 요청은 1년 immutable로 캐시해도 안전
+    def __init__(self, static_folder, check_mtime=False):
+        self.static_folder = static_folder
+        self.check_mtime = check_mtime
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, filename):
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._hashes.get(filename)
+        if cached and (not self.check_mtime or cached[0] == mtime):
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.md5(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._hashes[filename] = (mtime, digest)
+        return digest
+
+    def is_current(self, filename, version):
+        return bool(version) and version == self.fingerprint(filename)
+
+
+def page_etag(body):
+    return hashlib.md5(body).hexdigest()
+
+
+def is_taggable_page(request, response):
+    # 렌더링한 HTML 페이지만 대상 (스트리밍 다운로드/리다이렉트/정적 파일 제외)
+    return (
+        request.method in ('GET', 'HEAD')
+        and response.status_code == 200
+        and response.mimetype == 'text/html'
+        and 'ETag' not in response.headers
+    )
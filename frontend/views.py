@@ -0,0 +1,229 @@
+# app.py(Flask, 동기)와 asgi.py(Quart, 비동기)가 함께 쓰는 요청/응답 처리
+# 업스트림 호출과 flash/render처럼 프레임워크에 따라 await 여부가 다른 부분만 각 파일에 두고,
+# 파라미터 구성, 응답 해석, 헤더 선택, 메시지는 여기서 한 번만 정의한다.
+import time
+
+from rendering import page_etag
+
+PER_PAGE = 10
+EMPTY_LIST = {'posts': [], 'pages': 0, 'current_page': 1}
+EMPTY_AUTHOR_LIST = {'posts': [], 'total': 0}
+
+DOWNLOAD_PASSTHROUGH_HEADERS = (
+    'Content-Length', 'Content-Range', 'Accept-Ranges',
+    'ETag', 'Last-Modified', 'Cache-Control'
+)
+DOWNLOAD_FORWARD_HEADERS = ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since')
+REDIRECT_STATUSES = (301, 302, 303, 307)
+NOT_MODIFIED_HEADERS = ('ETag', 'Cache-Control', 'Vary')
+
+FORBIDDEN = {'error': '허용되지 않은 요청입니다'}
+LOGIN_REQUIRED = '로그인이 필요합니다.'
+UPLOAD_FAILED = '파일 업로드에 실패했습니다.'
+PRESIGNED_DISABLED = {'error': 'presigned 업로드가 비활성화되어 있습니다.'}
+INVALID_RANGE = {'error': '요청한 범위가 올바르지 않습니다'}
+
+
+def error_message(response, default):
+    # requests/httpx 응답 모두 json()을 제공한다
+    try:
+        return response.json().get('error', default)
+    except ValueError:
+        return default
+
+
+def is_internal_request(config, headers):
+    # 토큰이 없으면 거부한다. 토큰 없는 개발 환경은 INTERNAL_API_INSECURE로 명시적으로 허용
+    expected = config['INTERNAL_API_TOKEN']
+    if not expected:
+        return config['INTERNAL_API_INSECURE']
+    return headers.get('X-Internal-Token') == expected
+
+
+def consistency_headers(config, session):
+    # 방금 쓴 글이 레플리카 지연 때문에 안 보이지 않도록 primary 조회를 요청
+    if time.time() - session.get('last_write_at', 0) < config['READ_CONSISTENCY_WINDOW']:
+        return {'X-Consistency': 'primary'}
+    return {}
+
+
+def record_write(session):
+    session['last_write_at'] = time.time()
+
+
+def client_ip_headers(request):
+    # user-service의 IP별 로그인 시도 제한이 frontend가 아닌 실제 클라이언트 기준으로 동작하도록 전달
+    return {'X-Real-IP': request.headers.get('X-Real-IP') or request.remote_addr}
+
+
+def auth_headers(session):
+    return {'Authorization': f"Bearer {session['access_token']}"}
+
+
+def is_owner(session, post):
+    return session.get('user_id') == post.get('author_id')
+
+
+# 캐시 검증 (after_request)
+
+def not_modified_headers(response, body, session, request):
+    # 렌더링한 페이지에 약한 ETag를 붙이고, 클라이언트 ETag와 같으면 304로 보낼 헤더를 돌려준다
+    # (nginx gzip이 강한 ETag를 약하게 바꾸므로 처음부터 약한 ETag)
+    etag = page_etag(body)
+    response.set_etag(etag, weak=True)
+    if session:
+        response.headers['Cache-Control'] = 'private, no-cache'
+    if request.if_none_match.contains_weak(etag):
+        return {name: response.headers[name] for name in NOT_MODIFIED_HEADERS if name in response.headers}
+    return None
+
+
+# 게시글 목록
+
+def list_request(args):
+    # (경로, 파라미터, 실패 시 목록, 실패 메시지). 검색, 커서(깊은 페이지), 페이지 번호 순으로 고른다
+    page = args.get('page', 1, type=int)
+    cursor = args.get('cursor')
+    query = args.get('q', '').strip()
+    if query:
+        return (
+            '/posts/search', {'q': query, 'page': page, 'per_page': PER_PAGE},
+            {'posts': [], 'query': query, 'current_page': 1}, '검색에 실패했습니다.'
+        )
+    params = {'per_page': PER_PAGE, 'fields': 'list'}
+    if cursor:
+        params['cursor'] = cursor
+    else:
+        params['page'] = page
+    return '/posts', params, EMPTY_LIST, None
+
+
+def author_list_request(user_id, args):
+    params = {'per_page': PER_PAGE, 'fields': 'list'}
+    if args.get('cursor'):
+        params['cursor'] = args['cursor']
+    return f'/users/{user_id}/posts', params
+
+
+def posts_data_from(response, fallback, message=None):
+    # (목록 데이터, flash 메시지). message가 없으면 실패해도 빈 목록만 보여준다
+    if response.status_code == 200:
+        return response.json(), None
+    return fallback, error_message(response, message) if message else None
+
+
+# 회원가입/로그인
+
+def credentials(form):
+    return {'username': form['username'], 'password': form['password']}
+
+
+def register_result(response):
+    # (성공 여부, flash 메시지)
+    if response.status_code == 201:
+        return True, '회원가입이 완료되었습니다. 로그인해주세요.'
+    return False, error_message(response, '회원가입에 실패했습니다.')
+
+
+def login_result(response):
+    # (세션에 저장할 값 또는 None, flash 메시지)
+    if response.status_code == 200:
+        data = response.json()
+        values = {key: data[key] for key in ('access_token', 'user_id', 'username')}
+        return values, '로그인되었습니다. 이것은 CICD 테스트입니다.'
+    return None, error_message(response, '로그인에 실패했습니다.')
+
+
+# 글쓰기
+
+def presigned_upload(config, form):
+    # presigned 모드에서 브라우저가 S3에 직접 올린 파일: (file_id, 파일 이름). 없으면 None
+    if not config['FILE_PRESIGNED_MODE'] or not form.get('file_id'):
+        return None
+    file_id = form['file_id']
+    return file_id, form.get('file_name') or file_id
+
+
+def upload_completed(response):
+    # 검사/승격 요청 결과 (202: 대기열에 넣음, 200: 이미 끝남)
+    return response.status_code in (200, 202)
+
+
+def uploaded_file(response):
+    # 프록시 업로드 결과: (file_id, 원래 이름). 실패면 None
+    # 202: 받아 두기만 하고 처리 중 (게시글은 처리 완료를 기다리지 않고 작성)
+    if response.status_code not in (200, 202):
+        return None
+    data = response.json()
+    return data.get('file_id'), data.get('original_name')
+
+
+def upload_request(file, timeout, connect_timeout):
+    # multipart로 다시 인코딩하지 않고 본문을 그대로 스트리밍할 때의 공통 인자
+    return {
+        'params': {'filename': file.filename},
+        'headers': {'Content-Type': file.mimetype or 'application/octet-stream'},
+        'timeout': (connect_timeout, timeout),
+    }
+
+
+def post_payload(form, file_id=None, file_name=None):
+    return {
+        'title': form['title'],
+        'content': form['content'],
+        'file_id': file_id,
+        'file_name': file_name
+    }
+
+
+def write_result(response):
+    # (성공 여부, flash 메시지)
+    if response.status_code == 201:
+        return True, '게시글이 작성되었습니다.'
+    return False, error_message(response, '게시글 작성에 실패했습니다.')
+
+
+def delete_result(response):
+    if response.status_code == 200:
+        return True, '게시글이 삭제되었습니다.'
+    return False, error_message(response, '게시글 삭제에 실패했습니다.')
+
+
+# 첨부파일 다운로드
+
+def download_error_message(status_code):
+    # 409: 업로드 후 형식 확인/승격이 아직 끝나지 않은 첨부파일
+    if status_code == 409:
+        return '첨부파일을 처리하는 중입니다. 잠시 후 다시 시도해주세요.'
+    return '파일을 찾을 수 없습니다.'
+
+
+def download_params(args):
+    # 이미지 파생본(thumb/web) 요청은 그대로 전달
+    variant = args.get('variant')
+    return {'variant': variant} if variant else {}
+
+
+def presigned_location(response):
+    # file-service가 발급한 presigned GET 주소 (없으면 None)
+    if response.status_code in REDIRECT_STATUSES:
+        return response.headers.get('Location')
+    return None
+
+
+def forward_headers(request):
+    # 조건부/범위 요청 헤더는 file-service로 그대로 전달
+    return {name: request.headers[name] for name in DOWNLOAD_FORWARD_HEADERS if request.headers.get(name)}
+
+
+def passthrough_headers(response):
+    return {name: response.headers[name] for name in DOWNLOAD_PASSTHROUGH_HEADERS if name in response.headers}
+
+
+def download_headers(response, file_id):
+    headers = {
+        'Content-Type': response.headers.get('Content-Type', 'application/octet-stream'),
+        'Content-Disposition': response.headers.get('Content-Disposition', f'attachment; filename="{file_id}"')
+    }
+    headers.update(passthrough_headers(response))
+    return headers
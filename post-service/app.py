@@ -1,78 +1,336 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
-import requests
 import os
+import json
+import click
+from types import SimpleNamespace
 from models import db, Post
+from author_counts import adjust_author_counts, get_author_count, rebuild_author_counts
 from config import Config
+from auth import TokenVerifier
+from service_client import client_from_env
+from pagination import CachedCount, InvalidCursor, encode_cursor, keyset_filter
+from cache import ReadThroughCache, create_backend
+from search import create_search_backend
+from user_directory import UserDirectory
+from reconcile import reconcile_author_names
+from bulk import ImportAborted, export_posts, import_posts
+from events import TooManySubscribers, create_broker, stream_events
+from db_routing import ReplicaRouter, read_from_replica, on_replica
+import metrics
+from sqlalchemy.engine import make_url
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 db.init_app(app)
+metrics.init_app(app, 'post-service')
+metrics.instrument_sqlalchemy()
 
 USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'http://user-service:5001')
+FILE_SERVICE_URL = os.environ.get('FILE_SERVICE_URL', 'http://file-service:5003')
+
+user_service = metrics.instrument_client(
+    client_from_env('user-service', USER_SERVICE_URL, 'USER_SERVICE')
+)
+file_service = metrics.instrument_client(
+    client_from_env('file-service', FILE_SERVICE_URL, 'FILE_SERVICE')
+)
+
+token_verifier = TokenVerifier(
+    secret_key=app.config['JWT_SECRET_KEY'],
+    public_key=app.config['JWT_PUBLIC_KEY'],
+    algorithm=app.config['JWT_ALGORITHM'],
+    user_service=user_service,
+    cache_ttl=app.config['TOKEN_CACHE_TTL'],
+    cache_size=app.config['TOKEN_CACHE_SIZE']
+)
+
+user_directory = UserDirectory(
+    user_service,
+    batch_size=app.config['USER_DIRECTORY_BATCH_SIZE'],
+    cache_ttl=app.config['USER_DIRECTORY_CACHE_TTL'],
+    internal_token=app.config['INTERNAL_API_TOKEN']
+)
+
+post_count = CachedCount(
+    ttl=app.config['POST_COUNT_CACHE_TTL'],
+    mode=app.config['POST_COUNT_MODE']
+)
+
+post_cache = ReadThroughCache(create_backend(app.config))
+
+def request_writer():
+    # 요청의 Bearer 토큰 사용자 ID (서명/만료만 로컬에서 확인하고 user-service는 호출하지 않는다)
+    claims = token_verifier.decode(request.headers.get('Authorization', '').replace('Bearer ', ''))
+    return claims.get('sub') if claims else None
+
+# 조회 요청은 레플리카로, 사용자가 방금 쓴 경우에만 그 사용자의 조회를 primary로 보낸다
+# (쓴 사람별 마커를 캐시 백엔드에 기록. frontend는 세션별로 X-Consistency 헤더를 보낸다)
+replica_router = ReplicaRouter(
+    app,
+    replica_urls=app.config['DATABASE_REPLICA_URLS'],
+    engine_options=app.config['SQLALCHEMY_ENGINE_OPTIONS'],
+    consistency_window=app.config['DB_READ_CONSISTENCY_WINDOW'],
+    marker=post_cache.backend,
+    writer_key=request_writer
+)
+
+# 새 글/삭제 알림 브로커 (SSE 구독자에게 전달)
+events = create_broker(app.config)
+
+search_backend = create_search_backend(
+    make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+)
 
 def create_tables():
     db.create_all()
+    search_backend.ensure_index(db.session)
 
 def verify_user_token(token):
     try:
-        headers = {'Authorization': f'Bearer {token}'}
-        response = requests.post(f'{USER_SERVICE_URL}/verify', headers=headers)
-        if response.status_code == 200:
-            return response.json()
+        return token_verifier.verify(token)
+    except Exception:
         return None
-    except:
+
+def is_internal_request():
+    # 토큰이 없으면 거부한다. 토큰 없는 개발 환경은 INTERNAL_API_INSECURE로 명시적으로 허용
+    expected = app.config['INTERNAL_API_TOKEN']
+    if not expected:
+        return app.config['INTERNAL_API_INSECURE']
+    return request.headers.get('X-Internal-Token') == expected
+
+def is_admin_request():
+    # 일괄 내보내기/가져오기는 관리자 토큰이 설정된 경우에만 허용
+    expected = app.config['ADMIN_API_TOKEN']
+    return bool(expected) and request.headers.get('X-Admin-Token') == expected
+
+def internal_headers():
+    token = app.config['INTERNAL_API_TOKEN']
+    return {'X-Internal-Token': token} if token else {}
+
+def attachment_status(file_id):
+    # file-service 업로드 상태: pending/processing/ready/failed, 없는 파일이면 None
+    response = file_service.get(f'/uploads/{file_id}', headers=internal_headers())
+    if response.status_code == 404:
         return None
+    response.raise_for_status()
+    return response.json().get('status')
+
+def attachment_in_use(file_id):
+    # file_id는 어느 글에나 첨부할 수 있으므로 다른 게시글이 아직 참조하면 파일을 지우지 않는다.
+    # 삭제를 flush한 같은 트랜잭션에서 잠금 읽기로 확인해 같은 파일을 다루는 동시 삭제/작성과 겹치지 않게 한다
+    db.session.flush()
+    return db.session.query(Post.id).filter(Post.file_id == file_id).with_for_update().first() is not None
+
+def release_attachment(file_id):
+    # 게시글이 삭제되면 file-service에 첨부파일 참조 해제를 알린다.
+    # 실패해도 게시글 삭제는 유지하고, 남은 객체는 정리 작업이 회수한다.
+    if not file_id:
+        return
+    try:
+        response = file_service.delete(f'/internal/files/{file_id}', headers=internal_headers())
+        if response.status_code != 200:
+            app.logger.warning(f'첨부파일 삭제 실패 ({file_id}): {response.status_code}')
+    except Exception as e:
+        app.logger.warning(f'첨부파일 삭제 실패 ({file_id}): {e}')
+
+def serialize_post(post):
+    return {
+        'id': post.id,
+        'title': post.title,
+        'content': post.content,
+        'author_id': post.author_id,
+        'author_name': post.author_name,
+        'file_id': post.file_id,
+        'file_name': post.file_name,
+        'created_at': post.created_at.isoformat()
+    }
+
+def publish_event(event_type, data):
+    # 알림 실패가 글 작성/삭제를 실패시키지 않도록 기록만 남긴다
+    try:
+        events.publish(event_type, data)
+    except Exception as e:
+        app.logger.warning(f'이벤트 발행 실패 ({event_type}): {e}')
+
+def serialize_list_row(row):
+    excerpt_length = app.config['POST_EXCERPT_LENGTH']
+    return {
+        'id': row.id,
+        'title': row.title,
+        'excerpt': row.excerpt[:excerpt_length],
+        'truncated': len(row.excerpt) > excerpt_length,
+        'author_id': row.author_id,
+        'author_name': row.author_name,
+        'file_id': row.file_id,
+        'file_name': row.file_name,
+        'created_at': row.created_at.isoformat()
+    }
+
+def list_query(fields):
+    if fields == 'list':
+        # 목록 화면용 컬럼만 조회하고 본문은 DB에서 잘라서 가져옴
+        return db.session.query(
+            Post.id, Post.title, Post.author_id, Post.author_name,
+            Post.file_id, Post.file_name, Post.created_at,
+            db.func.substr(Post.content, 1, app.config['POST_EXCERPT_LENGTH'] + 1).label('excerpt')
+        )
+    return Post.query
+
+def load_posts_page(page, per_page, cursor, fields):
+    serialize = serialize_list_row if fields == 'list' else serialize_post
+
+    query = list_query(fields).order_by(Post.created_at.desc(), Post.id.desc())
+    if cursor is not None:
+        # 커서(keyset) 모드: OFFSET/COUNT 없이 (created_at, id) 인덱스만 사용
+        if cursor:
+            query = query.filter(keyset_filter(Post.created_at, Post.id, cursor))
+    else:
+        query = query.offset((page - 1) * per_page)
+
+    rows = query.limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_next else None
+
+    total = post_count.get(db.session, Post)
+    result = {
+        'posts': [serialize(row) for row in rows],
+        'total': total,
+        'has_next': has_next,
+        'next_cursor': next_cursor
+    }
+    if cursor is None:
+        result.update({
+            'pages': max((total + per_page - 1) // per_page, page if rows else 0),
+            'current_page': page,
+            'has_prev': page > 1
+        })
+    return result
 
 @app.route('/posts', methods=['GET'])
+@read_from_replica
 def get_posts():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), app.config['POSTS_MAX_PER_PAGE'])
+        cursor = request.args.get('cursor')
+        fields = request.args.get('fields')
+
+        def load():
+            return load_posts_page(page, per_page, cursor, fields)
+
+        # 앞쪽 N개 페이지(커서 모드는 첫 페이지)만 캐시
+        if cursor is None and page <= app.config['CACHE_LIST_PAGES']:
+            key = post_cache.list_key(page, per_page, fields or 'full')
+        elif cursor == '':
+            key = post_cache.list_key('cursor', per_page, fields or 'full')
+        else:
+            key = None
+
+        if key:
+            result = post_cache.get_or_load(key, load, ttl=app.config['CACHE_LIST_TTL'])
+        else:
+            result = load()
+        return jsonify(result), 200
+    except InvalidCursor:
+        return jsonify({'error': '잘못된 커서입니다'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def load_author_posts(author_id, per_page, cursor, fields):
+    # (author_id, created_at, id) 인덱스 범위 스캔 + 커서: 작성자의 글 수와 무관하게 per_page개만 읽는다
+    serialize = serialize_list_row if fields == 'list' else serialize_post
+    query = list_query(fields) \
+        .filter(Post.author_id == author_id) \
+        .order_by(Post.created_at.desc(), Post.id.desc())
+    if cursor:
+        query = query.filter(keyset_filter(Post.created_at, Post.id, cursor))
+
+    rows = query.limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    return {
+        'author_id': author_id,
+        'posts': [serialize(row) for row in rows],
+        'total': get_author_count(db.session, author_id),
+        'has_next': has_next,
+        'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if has_next else None
+    }
+
+@app.route('/users/<int:user_id>/posts', methods=['GET'])
+@read_from_replica
+def get_user_posts(user_id):
+    try:
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), app.config['POSTS_MAX_PER_PAGE'])
+        cursor = request.args.get('cursor') or ''
+        fields = request.args.get('fields')
+
+        def load():
+            return load_author_posts(user_id, per_page, cursor, fields)
+
+        # 첫 페이지만 캐시 (글 작성/삭제 시 목록 캐시와 함께 무효화)
+        if not cursor:
+            key = post_cache.list_key('author', user_id, per_page, fields or 'full')
+            result = post_cache.get_or_load(key, load, ttl=app.config['CACHE_LIST_TTL'])
+        else:
+            result = load()
+        return jsonify(result), 200
+    except InvalidCursor:
+        return jsonify({'error': '잘못된 커서입니다'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/posts/search', methods=['GET'])
+@read_from_replica
+def search_posts():
+    try:
+        query = request.args.get('q', '').strip()
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), app.config['POSTS_MAX_PER_PAGE'])
         
-        posts = Post.query.order_by(Post.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # ngram 토큰 크기(2)보다 짧은 검색어는 인덱스로 찾을 수 없음
+        if len(query) < app.config['SEARCH_MIN_QUERY_LENGTH']:
+            return jsonify({'error': f"검색어는 {app.config['SEARCH_MIN_QUERY_LENGTH']}글자 이상 입력해주세요"}), 400
         
-        posts_list = []
-        for post in posts.items:
-            posts_list.append({
-                'id': post.id,
-                'title': post.title,
-                'content': post.content,
-                'author_id': post.author_id,
-                'author_name': post.author_name,
-                'file_id': post.file_id,
-                'file_name': post.file_name,
-                'created_at': post.created_at.isoformat()
-            })
+        rows = search_backend.search(
+            db.session, query,
+            limit=per_page + 1,
+            offset=(page - 1) * per_page,
+            excerpt_length=app.config['POST_EXCERPT_LENGTH']
+        )
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
         
         return jsonify({
-            'posts': posts_list,
-            'total': posts.total,
-            'pages': posts.pages,
-            'current_page': posts.page,
-            'has_next': posts.has_next,
-            'has_prev': posts.has_prev
+            'posts': [dict(serialize_list_row(row), score=float(row.score)) for row in rows],
+            'query': query,
+            'current_page': page,
+            'has_next': has_next,
+            'has_prev': page > 1
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/posts/<int:post_id>', methods=['GET'])
+@read_from_replica
 def get_post(post_id):
     try:
-        post = Post.query.get_or_404(post_id)
-        return jsonify({
-            'id': post.id,
-            'title': post.title,
-            'content': post.content,
-            'author_id': post.author_id,
-            'author_name': post.author_name,
-            'file_id': post.file_id,
-            'file_name': post.file_name,
-            'created_at': post.created_at.isoformat()
-        }), 200
+        def load():
+            post = db.session.get(Post, post_id)
+            if post is None and on_replica():
+                # 레플리카에 아직 반영되지 않았을 수 있으므로 primary에서 다시 확인
+                with replica_router.primary():
+                    post = db.session.get(Post, post_id)
+            return serialize_post(post) if post else None
+
+        post = post_cache.get_or_load(
+            post_cache.detail_key(post_id), load, ttl=app.config['CACHE_DETAIL_TTL']
+        )
+        if post is None:
+            return jsonify({'error': '게시글을 찾을 수 없습니다'}), 404
+        return jsonify(post), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -98,6 +356,15 @@ def create_post():
         if not file_id:
             file_id = None
             file_name = None
+        else:
+            # 첨부파일이 아직 처리 중(pending)이어도 작성할 수 있다. 검사에 실패했거나 없는 파일만 거부
+            try:
+                status = attachment_status(file_id)
+            except Exception as e:
+                app.logger.warning(f'첨부파일 상태 조회 실패 ({file_id}): {e}')
+                return jsonify({'error': '첨부파일을 확인할 수 없습니다. 잠시 후 다시 시도해주세요.'}), 503
+            if status is None or status == 'failed':
+                return jsonify({'error': '첨부파일이 올바르지 않습니다.'}), 400
         
         post = Post(
             title=title,
@@ -109,7 +376,18 @@ def create_post():
         )
         
         db.session.add(post)
+        db.session.flush()
+        search_backend.index_post(db.session, post)
+        adjust_author_counts(db.session, {post.author_id: 1})
         db.session.commit()
+        replica_router.mark_write()
+        post_count.invalidate()
+        post_cache.invalidate_lists()
+        publish_event('post_created', serialize_list_row(SimpleNamespace(
+            id=post.id, title=post.title, excerpt=post.content[:app.config['POST_EXCERPT_LENGTH'] + 1],
+            author_id=post.author_id, author_name=post.author_name,
+            file_id=post.file_id, file_name=post.file_name, created_at=post.created_at
+        )))
         
         return jsonify({'message': '게시글이 작성되었습니다..', 'post_id': post.id}), 201
     except Exception as e:
@@ -129,13 +407,212 @@ def delete_post(post_id):
         if post.author_id != user_info['user_id']:
             return jsonify({'error': '본인의 게시글만 삭제할 수 있습니다'}), 403
         
+        file_id = post.file_id
         db.session.delete(post)
+        search_backend.remove_post(db.session, post_id)
+        adjust_author_counts(db.session, {post.author_id: -1})
+        if file_id and attachment_in_use(file_id):
+            file_id = None
         db.session.commit()
+        replica_router.mark_write()
+        post_count.invalidate()
+        post_cache.invalidate_post(post_id)
+        publish_event('post_deleted', {'id': post_id})
+        release_attachment(file_id)
         
         return jsonify({'message': '게시글이 삭제되었습니다'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# 새 글/삭제 알림 스트림 (Server-Sent Events). nginx가 /events로 직접 연결한다.
+# 연결마다 대기만 하므로 gevent 워커에서 수천 개를 유지할 수 있다.
+@app.route('/posts/stream', methods=['GET'])
+def stream_posts():
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    try:
+        subscription = events.subscribe(last_event_id)
+    except TooManySubscribers:
+        return jsonify({'error': '연결이 너무 많습니다'}), 503, {'Retry-After': '10'}
+    return Response(
+        stream_events(subscription, heartbeat=app.config['EVENTS_HEARTBEAT']),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# 전체 게시글을 id 순서의 NDJSON으로 스트리밍 (백업/이전용, ?after_id=로 이어받기)
+@app.route('/posts/export', methods=['GET'])
+def export_posts_ndjson():
+    if not is_admin_request():
+        return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+    after_id = max(request.args.get('after_id', 0, type=int), 0)
+    # 레플리카가 있으면 레플리카에서 읽는다 (응답 본문은 요청 컨텍스트가 끝난 뒤 생성됨)
+    engine = replica_router.choose() or db.engine
+    
+    def log_finish(stats):
+        app.logger.info(
+            f"게시글 내보내기: rows={stats['rows']} last_id={stats['last_id']} "
+            f"elapsed={stats['elapsed_seconds']}s rows/s={stats['rows_per_second']}"
+        )
+    
+    return Response(
+        export_posts(engine, yield_per=app.config['EXPORT_YIELD_PER'], after_id=after_id, on_finish=log_finish),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename="posts.ndjson"'}
+    )
+
+def after_import_chunk(stats):
+    replica_router.mark_write()
+    post_count.invalidate()
+    post_cache.invalidate_lists()
+
+# NDJSON 본문을 청크 단위 다중 행 INSERT로 가져온다 (?keep_ids=1이면 내보낸 id 유지)
+@app.route('/posts/import', methods=['POST'])
+def import_posts_ndjson():
+    if not is_admin_request():
+        return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+    chunk_size = min(
+        max(request.args.get('chunk_size', app.config['IMPORT_CHUNK_SIZE'], type=int), 1),
+        app.config['IMPORT_MAX_CHUNK_SIZE']
+    )
+    try:
+        report = import_posts(
+            db.session,
+            request.stream,
+            search_backend,
+            chunk_size=chunk_size,
+            keep_ids=request.args.get('keep_ids') == '1',
+            on_chunk=after_import_chunk
+        )
+        app.logger.info(f"게시글 가져오기: imported={report['imported']} rows/s={report['rows_per_second']}")
+        return jsonify(report), 200
+    except ImportAborted as e:
+        return jsonify(dict(e.report, error=str(e))), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# file-service 정리 작업이 호출: 주어진 file_id 중 게시글이 참조하는 것만 돌려준다
+@app.route('/internal/posts/file-refs', methods=['POST'])
+def get_file_refs():
+    if not is_internal_request():
+        return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+    try:
+        data = request.get_json(silent=True) or {}
+        file_ids = list({str(file_id) for file_id in data.get('file_ids', [])})
+        if len(file_ids) > app.config['FILE_REFS_MAX']:
+            return jsonify({'error': f"한 번에 최대 {app.config['FILE_REFS_MAX']}개까지 조회할 수 있습니다"}), 400
+        
+        referenced = []
+        if file_ids:
+            rows = db.session.query(Post.file_id).filter(Post.file_id.in_(file_ids)).distinct().all()
+            referenced = [row.file_id for row in rows]
+        return jsonify({'referenced': referenced}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# file-service가 호출: 업로드 검사에 실패한 첨부파일을 게시글에서 떼어낸다
+@app.route('/internal/posts/detach-file', methods=['POST'])
+def detach_file():
+    if not is_internal_request():
+        return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+    try:
+        data = request.get_json(silent=True) or {}
+        file_id = data.get('file_id')
+        if not file_id:
+            return jsonify({'error': 'file_id가 필요합니다'}), 400
+        
+        post_ids = [row.id for row in db.session.query(Post.id).filter(Post.file_id == file_id)]
+        if post_ids:
+            Post.query.filter(Post.id.in_(post_ids)) \
+                .update({'file_id': None, 'file_name': None}, synchronize_session=False)
+            db.session.commit()
+            replica_router.mark_write()
+            post_cache.invalidate_posts(post_ids)
+            app.logger.info(f"첨부파일 해제 ({file_id}, posts={post_ids}): {data.get('reason')}")
+        return jsonify({'file_id': file_id, 'detached': len(post_ids)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# user-service가 사용자 변경/삭제 시 호출하는 캐시 무효화 훅
+@app.route('/internal/auth/invalidate', methods=['POST'])
+def invalidate_user_cache():
+    if not is_internal_request():
+        return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+    data = request.get_json(silent=True) or {}
+    token_verifier.invalidate(data.get('user_id'))
+    return jsonify({'message': 'invalidated'}), 200
+
+# 작성 시점에 복사해 둔 author_name을 user-service 기준으로 맞춘다 (cron 등에서 주기 실행)
+#   flask --app app reconcile-authors --batch-size 500 --pause 0.05
+@app.cli.command('reconcile-authors')
+@click.option('--batch-size', type=int, default=None, help='배치당 조회할 게시글 수')
+@click.option('--pause', type=float, default=None, help='배치 사이 대기 시간(초)')
+@click.option('--dry-run', is_flag=True, help='변경 대상만 집계하고 갱신하지 않음')
+def reconcile_authors(batch_size, pause, dry_run):
+    def on_batch(changed_ids):
+        if changed_ids and not dry_run:
+            post_cache.invalidate_posts(changed_ids)
+
+    stats = reconcile_author_names(
+        user_directory,
+        batch_size=batch_size or app.config['RECONCILE_BATCH_SIZE'],
+        pause=app.config['RECONCILE_PAUSE'] if pause is None else pause,
+        deleted_name=app.config['DELETED_AUTHOR_NAME'],
+        dry_run=dry_run,
+        on_batch=on_batch
+    )
+    click.echo(
+        f"scanned={stats['scanned']} {'stale' if dry_run else 'updated'}={stats['updated']} "
+        f"batches={stats['batches']}"
+    )
+
+# 대량 백업/이전은 HTTP 타임아웃을 피해 CLI로도 실행할 수 있다
+#   flask --app app export-posts --output posts.ndjson
+#   flask --app app import-posts posts.ndjson --keep-ids
+@app.cli.command('export-posts')
+@click.option('--output', type=click.File('wb'), default='-', help='저장할 파일 (기본값: 표준 출력)')
+@click.option('--after-id', type=int, default=0, help='이 id 다음부터 내보냄')
+def export_posts_command(output, after_id):
+    def report(stats):
+        click.echo(
+            f"rows={stats['rows']} last_id={stats['last_id']} "
+            f"elapsed={stats['elapsed_seconds']}s rows/s={stats['rows_per_second']}",
+            err=True
+        )
+
+    for chunk in export_posts(db.engine, yield_per=app.config['EXPORT_YIELD_PER'], after_id=after_id, on_finish=report):
+        output.write(chunk)
+
+@app.cli.command('import-posts')
+@click.argument('source', type=click.File('rb'))
+@click.option('--chunk-size', type=int, default=None, help='INSERT/커밋 단위 행 수')
+@click.option('--keep-ids', is_flag=True, help='내보낸 파일의 id를 그대로 사용')
+def import_posts_command(source, chunk_size, keep_ids):
+    def progress(stats):
+        after_import_chunk(stats)
+        click.echo(f'imported={stats.imported} skipped={stats.skipped}', err=True)
+
+    try:
+        report = import_posts(
+            db.session,
+            source,
+            search_backend,
+            chunk_size=chunk_size or app.config['IMPORT_CHUNK_SIZE'],
+            keep_ids=keep_ids,
+            on_chunk=progress
+        )
+    except ImportAborted as e:
+        click.echo(json.dumps(e.report, ensure_ascii=False, indent=2), err=True)
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
+
+# 작성자별 게시글 수를 posts 테이블 기준으로 다시 계산 (도입 시 1회, 이후 보정용)
+#   flask --app app rebuild-author-counts
+@app.cli.command('rebuild-author-counts')
+def rebuild_author_counts_command():
+    authors = rebuild_author_counts(db.session)
+    post_cache.invalidate_lists()
+    click.echo(f'authors={authors}')
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy'}), 200
@@ -0,0 +1,108 @@
+import jwt
+import requests
+
+from cache import TTLCache
+
+
+class TokenVerificationUnavailable(Exception):
+    pass
+
+
+MISSING = object()
+
+
+class TokenVerifier:
+    # 서명/만료는 로컬에서 검증하고, 사용자 존재 여부만 TTL 캐시로 user-service에 확인한다.
+    def __init__(self, secret_key=None, public_key=None, algorithm='HS256',
+                 user_service=None, cache_ttl=60, cache_size=10000,
+                 negative_cache_ttl=None, remote_timeout=2):
+        self.key = public_key or secret_key
+        self.algorithm = algorithm
+        # user_service: base_url 문자열 또는 post(path, **kwargs)를 제공하는 ServiceClient
+        self.user_service = user_service
+        self.remote_timeout = remote_timeout
+        self.negative_cache_ttl = cache_ttl if negative_cache_ttl is None else negative_cache_ttl
+        self.cache = TTLCache(ttl=cache_ttl, maxsize=cache_size)
+
+    def decode(self, token):
+        if not token:
+            return None
+        try:
+            claims = jwt.decode(
+                token,
+                self.key,
+                algorithms=[self.algorithm],
+                options={'require': ['exp', 'sub']}
+            )
+        except jwt.PyJWTError:
+            return None
+        if claims.get('type', 'access') != 'access':
+            return None
+        return claims
+
+    def verify(self, token):
+        claims, user_info = self.check_local(token)
+        if claims is None:
+            return None
+        if user_info is MISSING:
+            user_info = self.remember(claims, self._fetch_remote(token))
+        return self.result(claims, user_info)
+
+    # verify()를 로컬 단계와 원격 단계로 나눠 쓸 수 있도록 분리 (비동기 게이트웨이용)
+    def check_local(self, token):
+        # (claims, 캐시된 사용자 정보) 반환. claims가 None이면 무효, 정보가 MISSING이면 원격 확인 필요
+        claims = self.decode(token)
+        if claims is None:
+            return None, None
+        try:
+            claims['user_id'] = int(claims['sub'])
+        except (TypeError, ValueError):
+            return None, None
+        return claims, self.cache.get(claims['user_id'], MISSING)
+
+    def remember(self, claims, user_info):
+        ttl = None if user_info else self.negative_cache_ttl
+        self.cache.set(claims['user_id'], user_info, ttl=ttl)
+        return user_info
+
+    def result(self, claims, user_info):
+        if not user_info:
+            return None
+        return {
+            'valid': True,
+            'user_id': claims['user_id'],
+            'username': user_info.get('username') or claims.get('username')
+        }
+
+    def invalidate(self, user_id=None):
+        if user_id is None:
+            self.cache.clear()
+        else:
+            self.cache.delete(int(user_id))
+
+    def _fetch_remote(self, token):
+        if not self.user_service:
+            # user-service 확인 없이 서명된 클레임만 신뢰
+            return {'username': None}
+        try:
+            headers = {'Authorization': f'Bearer {token}'}
+            if isinstance(self.user_service, str):
+                response = requests.post(
+                    f'{self.user_service}/verify',
+                    headers=headers,
+                    timeout=self.remote_timeout
+                )
+            else:
+                response = self.user_service.post(
+                    '/verify',
+                    headers=headers,
+                    timeout=self.remote_timeout
+                )
+        except requests.RequestException as e:
+            raise TokenVerificationUnavailable(str(e))
+        if response.status_code == 200:
+            data = response.json()
+            return data if data.get('valid') else None
+        if response.status_code in (401, 404, 422):
+            return None
+        raise TokenVerificationUnavailable(f'unexpected status {response.status_code}')
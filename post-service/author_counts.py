@@ -0,0 +1,68 @@
+from sqlalchemy import func, insert, update
+
+from models import AuthorPostCount, Post
+
+
+def _increment(session, dialect, author_id, delta):
+    table = AuthorPostCount.__table__
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        statement = mysql_insert(table).values(author_id=author_id, post_count=delta)
+        statement = statement.on_duplicate_key_update(post_count=table.c.post_count + delta)
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        statement = sqlite_insert(table).values(author_id=author_id, post_count=delta)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.author_id], set_={'post_count': table.c.post_count + delta}
+        )
+    else:
+        updated = session.execute(
+            update(table).where(table.c.author_id == author_id).values(post_count=table.c.post_count + delta)
+        ).rowcount
+        if updated:
+            return
+        statement = insert(table).values(author_id=author_id, post_count=delta)
+    session.execute(statement)
+
+
+def _decrement(session, dialect, author_id, delta):
+    table = AuthorPostCount.__table__
+    # 0 아래로 내려가지 않게 (MySQL은 GREATEST, SQLite는 스칼라 MAX)
+    clamp = func.greatest if dialect == 'mysql' else func.max
+    session.execute(
+        update(table)
+        .where(table.c.author_id == author_id)
+        .values(post_count=clamp(table.c.post_count - delta, 0))
+    )
+
+
+def adjust_author_counts(session, deltas):
+    # deltas: {author_id: 증감}. 호출한 쪽의 트랜잭션 안에서 실행되어 게시글 변경과 함께 커밋/롤백된다.
+    # 여러 작성자를 한 번에 바꿀 때 교착을 피하려고 author_id 순서로 잠근다.
+    dialect = session.get_bind().dialect.name
+    for author_id in sorted(deltas):
+        delta = deltas[author_id]
+        if delta > 0:
+            _increment(session, dialect, author_id, delta)
+        elif delta < 0:
+            _decrement(session, dialect, author_id, -delta)
+
+
+def get_author_count(session, author_id):
+    count = session.query(AuthorPostCount.post_count) \
+        .filter(AuthorPostCount.author_id == author_id) \
+        .scalar()
+    return count or 0
+
+
+def rebuild_author_counts(session):
+    # 기존 데이터 채우기/보정용 (요청 경로에서는 호출하지 않음)
+    rows = session.query(Post.author_id, func.count(Post.id)).group_by(Post.author_id).all()
+    session.query(AuthorPostCount).delete(synchronize_session=False)
+    if rows:
+        session.execute(
+            insert(AuthorPostCount.__table__),
+            [{'author_id': author_id, 'post_count': count} for author_id, count in rows]
+        )
+    session.commit()
+    return len(rows)
@@ -0,0 +1,159 @@
+import json
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+
+from models import Post
+from author_counts import adjust_author_counts
+
+EXPORT_COLUMNS = (
+    'id', 'title', 'content', 'author_id', 'author_name', 'file_id', 'file_name', 'created_at'
+)
+REQUIRED_FIELDS = ('title', 'content', 'author_id', 'author_name')
+
+
+class ImportAborted(Exception):
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.lines = 0
+        self.imported = 0
+        self.skipped = 0
+        self.chunks = 0
+        self.errors = []
+
+    def error(self, line_number, message):
+        self.skipped += 1
+        if len(self.errors) < 20:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            'lines': self.lines,
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'chunks': self.chunks,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.imported / elapsed, 1) if elapsed else 0.0,
+            'errors': self.errors
+        }
+
+
+def export_posts(engine, yield_per=1000, after_id=0, on_finish=None):
+    # id 순서로 전체 게시글을 NDJSON 줄로 내보낸다.
+    # 서버 측 커서(stream_results)로 yield_per개씩만 가져오므로 테이블 크기와 무관하게 메모리가 일정하다.
+    table = Post.__table__
+    statement = select(*(table.c[name] for name in EXPORT_COLUMNS)) \
+        .where(table.c.id > after_id) \
+        .order_by(table.c.id) \
+        .prefix_with('/*+ MAX_EXECUTION_TIME(0) */', dialect='mysql')  # 세션 SELECT 시간 제한 해제
+    started = time.monotonic()
+    count = 0
+    last_id = after_id
+    try:
+        with engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=yield_per).execute(statement)
+            for rows in result.partitions():
+                count += len(rows)
+                last_id = rows[-1].id
+                yield ''.join(serialize_export_row(row) for row in rows).encode('utf-8')
+    finally:
+        if on_finish:
+            elapsed = time.monotonic() - started
+            on_finish({
+                'rows': count,
+                'last_id': last_id,
+                'elapsed_seconds': round(elapsed, 3),
+                'rows_per_second': round(count / elapsed, 1) if elapsed else 0.0
+            })
+
+
+def serialize_export_row(row):
+    data = dict(row._mapping)
+    if data['created_at'] is not None:
+        data['created_at'] = data['created_at'].isoformat()
+    return json.dumps(data, ensure_ascii=False) + '\n'
+
+
+def parse_import_line(line, keep_ids):
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError('JSON 객체가 아닙니다')
+    missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+    if missing:
+        raise ValueError(f"필수 필드 누락: {', '.join(missing)}")
+
+    row = {
+        'title': str(data['title'])[:200],
+        'content': str(data['content']),
+        'author_id': int(data['author_id']),
+        'author_name': str(data['author_name'])[:80],
+        'file_id': data.get('file_id') or None,
+        'file_name': data.get('file_name') or None,
+        # 작성 시각이 없으면 저장할 때 DB 시각(NOW())으로 채운다 (DB 타임존 기준, _insert_chunk 참고)
+        'created_at': datetime.fromisoformat(data['created_at']) if data.get('created_at') else None
+    }
+    if keep_ids:
+        row['id'] = int(data['id'])
+    return row
+
+
+def import_posts(session, lines, search_backend, chunk_size=1000, keep_ids=False, on_chunk=None):
+    # NDJSON 줄을 chunk_size개씩 모아 다중 행 INSERT 한 번 + 커밋 한 번으로 넣는다.
+    # 잘못된 줄은 건너뛰고, DB 오류가 나면 해당 청크만 롤백하고 중단한다 (이전 청크는 이미 커밋됨).
+    stats = ImportStats()
+    chunk = []
+    line_number = 0
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        stats.lines += 1
+        try:
+            chunk.append(parse_import_line(line, keep_ids))
+        except (ValueError, TypeError, KeyError) as e:
+            stats.error(line_number, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            _insert_chunk(session, chunk, search_backend, stats, line_number, on_chunk)
+            chunk = []
+    if chunk:
+        _insert_chunk(session, chunk, search_backend, stats, line_number, on_chunk)
+    return stats.report()
+
+
+def _insert_chunk(session, rows, search_backend, stats, line_number, on_chunk):
+    table = Post.__table__
+    try:
+        # 다중 행 INSERT는 행마다 같은 컬럼을 넣어야 하므로 컬럼을 빼는 대신 DB 시각을 한 번 조회해 채운다
+        missing_created_at = [row for row in rows if row['created_at'] is None]
+        if missing_created_at:
+            now = session.execute(select(func.now())).scalar()
+            for row in missing_created_at:
+                row['created_at'] = now
+        if search_backend.needs_bulk_index:
+            # 검색 인덱스를 직접 관리하는 백엔드는 새 id가 필요하다 (RETURNING)
+            inserted = session.execute(
+                insert(table).returning(table.c.id, table.c.title, table.c.content), rows
+            ).all()
+            search_backend.index_rows(session, inserted)
+        else:
+            session.execute(insert(table), rows)
+        adjust_author_counts(session, Counter(row['author_id'] for row in rows))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise ImportAborted(f'{line_number}번째 줄까지의 청크 저장 실패: {e}', stats.report())
+    stats.imported += len(rows)
+    stats.chunks += 1
+    if on_chunk:
+        on_chunk(stats)
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    # 최대 maxsize개를 LRU로 유지하고 항목마다 ttl초 후 만료
+    def __init__(self, ttl=300, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LocalBackend:
+    # 프로세스 내 LRU 백엔드 (기본값). 워커마다 따로 유지된다.
+    # 무효화는 쓰기를 처리한 워커에만 반영되므로 max_ttl로 값의 수명을 제한해
+    # 다른 워커가 오래된 값을 돌려주는 시간을 max_ttl초 이내로 묶는다 (0이면 제한 없음)
+    def __init__(self, maxsize=10000, default_ttl=60, max_ttl=0):
+        self._cache = TTLCache(ttl=default_ttl, maxsize=maxsize)
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if self.max_ttl:
+            ttl = min(ttl, self.max_ttl)
+        self._cache.set(key, value, ttl=ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._cache.get(key) is not None:
+                return False
+            self._cache.set(key, value, ttl=ttl)
+            return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._cache.get(key) or 0) + 1
+            self._cache.set(key, value, ttl=365 * 24 * 3600)
+            return value
+
+
+class RedisBackend:
+    # redis-py 호환 클라이언트(redis.Redis, fakeredis.FakeRedis 등)를 감싼 공유 백엔드
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=ttl)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(key, value, ex=ttl, nx=True))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+
+def create_backend(config):
+    if config['CACHE_BACKEND'] == 'redis':
+        import redis
+        return RedisBackend(redis.Redis.from_url(config['CACHE_REDIS_URL']))
+    return LocalBackend(
+        maxsize=config['CACHE_MAX_ENTRIES'],
+        default_ttl=config['CACHE_DEFAULT_TTL'],
+        max_ttl=config['CACHE_LOCAL_MAX_TTL']
+    )
+
+
+class ReadThroughCache:
+    # 캐시 미스 시 한 요청만 DB를 조회하고(single-flight) 나머지는 채워진 값을 기다린다
+    def __init__(self, backend, prefix='posts', lock_timeout=5, wait_interval=0.02):
+        self.backend = backend
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.wait_interval = wait_interval
+        # 키별 락 대신 고정 개수의 락을 나눠 써서 메모리 사용량을 제한
+        self._local_locks = [threading.Lock() for _ in range(64)]
+
+    def _local_lock(self, key):
+        return self._local_locks[hash(key) % len(self._local_locks)]
+
+    def get_or_load(self, key, loader, ttl=None):
+        cached = self.backend.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        # 같은 프로세스 안의 동시 미스는 스레드 락으로, 프로세스 간에는 백엔드 락으로 묶는다
+        with self._local_lock(key):
+            cached = self.backend.get(key)
+            if cached is not None:
+                return json.loads(cached)
+
+            lock_key = f'{key}:lock'
+            acquired = self.backend.add(lock_key, '1', ttl=self.lock_timeout)
+            if not acquired:
+                deadline = time.monotonic() + self.lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(self.wait_interval)
+                    cached = self.backend.get(key)
+                    if cached is not None:
+                        return json.loads(cached)
+            try:
+                value = loader()
+                if value is not None:
+                    self.backend.set(key, json.dumps(value), ttl=ttl)
+                return value
+            finally:
+                if acquired:
+                    self.backend.delete(lock_key)
+
+    # 목록 캐시 키에는 세대 번호를 넣어 글 작성/삭제 시 한 번에 무효화
+    def list_generation(self):
+        return self.backend.get(f'{self.prefix}:list:gen') or '0'
+
+    def list_key(self, *parts):
+        suffix = ':'.join(str(part) for part in parts)
+        return f'{self.prefix}:list:{self.list_generation()}:{suffix}'
+
+    def detail_key(self, post_id):
+        return f'{self.prefix}:detail:{post_id}'
+
+    def invalidate_lists(self):
+        self.backend.incr(f'{self.prefix}:list:gen')
+
+    def invalidate_post(self, post_id):
+        self.backend.delete(self.detail_key(post_id))
+        self.invalidate_lists()
+
+    def invalidate_posts(self, post_ids):
+        if not post_ids:
+            return
+        self.backend.delete(*[self.detail_key(post_id) for post_id in post_ids])
+        self.invalidate_lists()
@@ -0,0 +1,142 @@
+import functools
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+
+
+class RoutingSession(Session):
+    # g.read_engine이 지정된 요청의 SELECT만 레플리카로 보내고, flush/쓰기는 항상 primary로 보낸다
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            engine = g.get('read_engine')
+            if engine is not None and (clause is None or getattr(clause, 'is_select', False)):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class LocalMarker:
+    # 공유 marker가 없을 때 쓰는 프로세스 내 기록 (get/set(ttl)만 제공)
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            expires_at = self._expires.get(key)
+            if expires_at is None or expires_at < time.monotonic():
+                self._expires.pop(key, None)
+                return None
+            return '1'
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._expires[key] = time.monotonic() + (ttl or 0)
+            self._expires.move_to_end(key)
+            while len(self._expires) > self.maxsize:
+                self._expires.popitem(last=False)
+
+
+class ReplicaRouter:
+    # 읽기 전용 레플리카 선택 + read-your-writes 판단. 다음 경우 primary에서 읽는다
+    #  - 클라이언트가 X-Consistency: primary 헤더를 보낸 경우 (frontend는 세션별로 방금 쓴 경우에 보낸다)
+    #  - 요청한 사용자(writer_key)가 consistency_window초 안에 쓴 기록이 marker에 있는 경우
+    # 기록은 쓴 사람별로 남기므로 다른 사용자의 쓰기는 레플리카 사용에 영향을 주지 않는다.
+    # marker를 공유(Redis)하지 않으면 기록은 워커별이라 다른 워커에서는 헤더만으로 보장된다.
+    MARKER_KEY = 'db:last_write'
+
+    def __init__(self, app=None, replica_urls=None, engine_options=None,
+                 consistency_window=5, marker=None, writer_key=None):
+        self.replica_urls = list(replica_urls or [])
+        self.engine_options = dict(engine_options or {})
+        self.consistency_window = consistency_window
+        self.marker = marker if marker is not None else LocalMarker()
+        # 현재 요청의 사용자 식별자(없으면 None)를 돌려주는 함수
+        self.writer_key = writer_key
+        self._engines = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['replica_router'] = self
+
+    @property
+    def engines(self):
+        # 워커 프로세스 안에서 처음 사용할 때 엔진(커넥션 풀) 생성
+        if self._engines is None:
+            with self._lock:
+                if self._engines is None:
+                    self._engines = [create_engine(url, **self.engine_options) for url in self.replica_urls]
+        return self._engines
+
+    def dispose(self, close=True):
+        # fork 직후 워커에서는 close=False: 부모와 공유하는 커넥션을 닫지 않고 버리기만 한다
+        with self._lock:
+            for engine in self._engines or []:
+                engine.dispose(close=close)
+            self._engines = None
+
+    def current_writer(self):
+        if self.writer_key is None or not has_request_context():
+            return None
+        return self.writer_key()
+
+    def mark_write(self, writer=None):
+        # 사용자를 알 수 없는 쓰기(내부/관리 작업)는 기록하지 않는다
+        writer = writer if writer is not None else self.current_writer()
+        if writer is None or self.consistency_window <= 0:
+            return
+        try:
+            self.marker.set(f'{self.MARKER_KEY}:{writer}', '1', ttl=self.consistency_window)
+        except Exception:
+            current_app.logger.warning('failed to record last write marker', exc_info=True)
+
+    def recently_written(self, writer):
+        if writer is None:
+            return False
+        try:
+            return self.marker.get(f'{self.MARKER_KEY}:{writer}') is not None
+        except Exception:
+            return True  # 판단할 수 없으면 primary에서 읽는다
+
+    def choose(self):
+        if not self.replica_urls:
+            return None
+        if request.headers.get('X-Consistency') == 'primary' or self.recently_written(self.current_writer()):
+            return None
+        return random.choice(self.engines)
+
+    @contextmanager
+    def primary(self):
+        # 레플리카에서 못 찾은 데이터를 primary에서 다시 확인할 때 사용
+        engine = g.pop('read_engine', None)
+        try:
+            yield
+        finally:
+            if engine is not None:
+                g.read_engine = engine
+
+
+def read_from_replica(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        router = current_app.extensions.get('replica_router')
+        engine = router.choose() if router else None
+        if engine is not None:
+            g.read_engine = engine
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop('read_engine', None)
+    return wrapper
+
+
+def on_replica():
+    return has_app_context() and g.get('read_engine') is not None
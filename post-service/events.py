@@ -0,0 +1,145 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, broker, maxsize):
+        self.broker = broker
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def get(self, timeout):
+        # 이벤트가 없으면 None (호출한 쪽이 heartbeat를 보낸다)
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    # 프로세스 내 브로커: 구독자마다 작은 큐를 두고 발행 시 큐에 넣기만 한다.
+    # 느린 구독자(큐가 가득 참)는 끊어서 재연결(Last-Event-ID로 누락분 재전송)하게 한다.
+    def __init__(self, max_subscribers=1000, queue_size=100, replay_size=200):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._recent = deque(maxlen=replay_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id=None):
+        subscription = Subscription(self, self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers()
+            self._subscribers.add(subscription)
+            # 재연결한 클라이언트에게 놓친 이벤트를 먼저 보낸다
+            if last_event_id is not None:
+                for event in self._recent:
+                    if event['id'] > last_event_id:
+                        subscription.queue.put_nowait(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.closed = True
+
+    def publish(self, event_type, data):
+        self.deliver({'id': next(self._ids), 'type': event_type, 'data': data})
+
+    def deliver(self, event):
+        with self._lock:
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                self.unsubscribe(subscription)
+
+    def close(self):
+        pass
+
+
+class RedisBroker(LocalBroker):
+    # 여러 워커/레플리카에 전달: 발행은 Redis PUBLISH, 프로세스마다 리스너 스레드 하나가 받아 로컬 구독자에게 전달
+    # 이벤트 id는 Redis INCR로 매겨 어느 워커에 재연결해도 Last-Event-ID가 통한다.
+    def __init__(self, client, channel='posts:events', **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.channel = channel
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, last_event_id=None):
+        self._ensure_listener()
+        return super().subscribe(last_event_id)
+
+    def publish(self, event_type, data):
+        event_id = self.client.incr(f'{self.channel}:seq')
+        self.client.publish(self.channel, json.dumps({'id': event_id, 'type': event_type, 'data': data}))
+
+    def _ensure_listener(self):
+        # fork 이후(워커 안에서) 처음 구독할 때 시작
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='events-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self.deliver(json.loads(message['data']))
+            except Exception:
+                time.sleep(1)  # Redis 재시작 등: 잠시 후 다시 구독
+            finally:
+                pubsub.close()
+
+
+def create_broker(config):
+    options = {
+        'max_subscribers': config['EVENTS_MAX_SUBSCRIBERS'],
+        'queue_size': config['EVENTS_QUEUE_SIZE'],
+        'replay_size': config['EVENTS_REPLAY_SIZE'],
+    }
+    if config['EVENTS_BACKEND'] == 'redis':
+        import redis
+        return RedisBroker(redis.Redis.from_url(config['EVENTS_REDIS_URL']), **options)
+    return LocalBroker(**options)
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+
+def stream_events(subscription, heartbeat=15, retry_ms=3000):
+    # text/event-stream 본문. 이벤트가 없을 때는 주석 줄로 연결을 유지한다 (프록시 유휴 타임아웃 방지)
+    try:
+        yield f'retry: {retry_ms}\n\n'
+        while not subscription.closed:
+            event = subscription.get(timeout=heartbeat)
+            yield format_event(event) if event is not None else ': keepalive\n\n'
+    finally:
+        subscription.close()
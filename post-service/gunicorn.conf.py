@@ -0,0 +1,128 @@
+# gunicorn이 작업 디렉터리의 gunicorn.conf.py를 자동으로 읽는다
+# 기본값은 아래 역할별 프로필이며 GUNICORN_* 환경 변수(또는 명령줄 옵션)로 덮어쓸 수 있다.
+#
+# post-service: gevent 워커. 대기 중인 SSE 연결(/posts/stream)과 업스트림 호출이 워커를 점유하지 않도록
+# 연결마다 greenlet 하나만 쓴다.
+import os
+import shutil
+import subprocess
+import sys
+
+
+def cpu_count():
+    # 컨테이너 CPU 제한(cgroup v2 cpu.max)이 있으면 그 값을, 없으면 사용 가능한 CPU 수를 쓴다
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5002')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('GUNICORN_WORKERS', max(2, cpu_count())))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 2000))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# nginx upstream keepalive(기본 60초)보다 길게 유지해 재사용 중 끊기는 경합을 피한다 (sync 워커는 무시)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 65))
+
+# 마스터에서 앱을 한 번 import하고 fork: 워커끼리 코드/모듈 메모리를 copy-on-write로 공유하고 기동이 빨라진다
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+if worker_class == 'gevent' and preload_app:
+    # 워커는 fork 이후에야 monkey patch를 하므로, 마스터에서 앱을 import하기 전에 먼저 패치한다
+    # (패치 전에 만든 threading.Lock/소켓이 워커에서 이벤트 루프를 막지 않도록)
+    from gevent import monkey
+    monkey.patch_all()
+
+# 요청 수가 쌓이면 워커를 교체해 메모리 증가(단편화, 누수)를 되돌린다. jitter로 동시에 재시작되지 않게 분산
+# (교체되는 워커의 SSE 연결은 끊기고, 브라우저가 Last-Event-ID로 재연결한다)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+wsgi_app = 'app:app'
+
+
+CREATE_TABLES = (
+    'from app import app, create_tables\n'
+    'with app.app_context():\n'
+    '    create_tables()\n'
+)
+
+
+def check_shared_state(server):
+    # local 백엔드는 워커마다 따로 동작하므로 워커가 여럿이면 정합성 한계를 알린다
+    if server.cfg.workers <= 1:
+        return
+    # 새 글 알림은 다른 워커에서 작성된 글을 통째로 놓치므로 기동을 막는다
+    if os.environ.get('EVENTS_BACKEND', 'local') == 'local' and \
+            os.environ.get('EVENTS_ALLOW_LOCAL_MULTIWORKER', 'false').lower() != 'true':
+        server.log.error(
+            'EVENTS_BACKEND=local with %s workers: /posts/stream subscribers would miss posts created '
+            'on other workers. Set EVENTS_BACKEND=redis, run a single worker (GUNICORN_WORKERS=1), '
+            'or set EVENTS_ALLOW_LOCAL_MULTIWORKER=true to accept it',
+            server.cfg.workers
+        )
+        sys.exit(1)
+    if os.environ.get('CACHE_BACKEND', 'local') != 'local':
+        return
+    server.log.warning(
+        'CACHE_BACKEND=local with %s workers: cache invalidation reaches only the worker that wrote, '
+        'other workers may serve stale posts for up to CACHE_LOCAL_MAX_TTL=%ss; set CACHE_BACKEND=redis to share it',
+        server.cfg.workers, os.environ.get('CACHE_LOCAL_MAX_TTL', '5')
+    )
+    if os.environ.get('DATABASE_REPLICA_URLS'):
+        server.log.warning(
+            'DATABASE_REPLICA_URLS is set but the per-user read-your-writes markers are per worker: '
+            'only requests with X-Consistency: primary are guaranteed to read their own writes'
+        )
+
+
+def on_starting(server):
+    check_shared_state(server)
+
+    # 이전 실행에서 남은 워커별 메트릭 파일 정리
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    # gunicorn은 app.py의 __main__ 블록을 실행하지 않으므로 워커를 띄우기 전에 테이블을 한 번 만든다.
+    # preload가 꺼져 있으면 마스터가 앱을 import하지 않도록 별도 프로세스에서 실행
+    if server.cfg.preload_app:
+        from app import app, create_tables
+        with app.app_context():
+            create_tables()
+    else:
+        subprocess.run([sys.executable, '-c', CREATE_TABLES], check=True)
+
+
+def post_fork(server, worker):
+    # preload로 마스터에서 만든 커넥션/풀을 워커가 그대로 쓰지 않도록 정리 (다음 사용 시 워커에서 새로 생성)
+    if not server.cfg.preload_app:
+        return
+    from app import app, db, file_service, replica_router, user_service
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    replica_router.dispose(close=False)
+    for client in (user_service, file_service):
+        client.reset()
+
+
+def post_worker_init(worker):
+    worker.log.info('Worker ready (pid: %s)', worker.pid)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
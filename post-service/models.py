@@ -1,9 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Post(db.Model):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # 목록 정렬/커서 페이지네이션용 복합 인덱스
+        db.Index('idx_created_at_id', 'created_at', 'id'),
+        # 작성자별 목록(/users/<id>/posts): 필터와 정렬을 인덱스 범위 스캔 하나로 처리
+        db.Index('idx_author_created_at_id', 'author_id', 'created_at', 'id'),
+        # 첨부파일 참조 확인(정리 작업)용
+        db.Index('idx_file_id', 'file_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -15,3 +25,18 @@ class Post(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
 
+class AuthorPostCount(db.Model):
+    # 작성자별 게시글 수 (작성/삭제/가져오기 트랜잭션 안에서 증감, COUNT(*) 대신 사용)
+    __tablename__ = 'author_post_counts'
+    
+    author_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    post_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# 제목/본문 검색용 FULLTEXT 인덱스 (한국어는 공백 단위가 아니므로 ngram 파서 사용, MySQL 전용)
+event.listen(
+    Post.__table__,
+    'after_create',
+    DDL('ALTER TABLE posts ADD FULLTEXT INDEX ft_title_content (title, content) WITH PARSER ngram')
+    .execute_if(dialect='mysql')
+)
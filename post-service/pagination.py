@@ -0,0 +1,70 @@
+import base64
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import and_, or_, text
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, post_id):
+    raw = f'{created_at.isoformat()}|{post_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, post_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def keyset_filter(created_at_column, id_column, cursor):
+    # (created_at, id) < (cursor.created_at, cursor.id) — 복합 인덱스 범위 스캔으로 처리됨
+    created_at, post_id = decode_cursor(cursor)
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < post_id)
+    )
+
+
+class CachedCount:
+    # 전체 게시글 수를 ttl초 동안 캐시. 'estimate' 모드는 MySQL 통계값(TABLE_ROWS)을 사용
+    def __init__(self, ttl=30, mode='exact'):
+        self.ttl = ttl
+        self.mode = mode
+        self._value = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, session, model):
+        now = time.monotonic()
+        if self._value is not None and now < self._expires_at:
+            return self._value
+        with self._lock:
+            if self._value is None or time.monotonic() >= self._expires_at:
+                self._value = self._count(session, model)
+                self._expires_at = time.monotonic() + self.ttl
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+
+    def _count(self, session, model):
+        if self.mode == 'estimate' and session.get_bind().dialect.name == 'mysql':
+            estimate = session.execute(
+                text(
+                    'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                    'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table'
+                ),
+                {'table': model.__tablename__}
+            ).scalar()
+            if estimate is not None:
+                return int(estimate)
+        return session.query(model).count()
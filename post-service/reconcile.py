@@ -0,0 +1,48 @@
+import time
+from collections import defaultdict
+
+from models import db, Post
+
+
+def reconcile_author_names(directory, batch_size=500, pause=0.05, deleted_name=None,
+                           dry_run=False, on_batch=None):
+    # 기본 키 범위로 batch_size개씩 훑으면서 이름이 바뀐(또는 탈퇴한) 작성자의 author_name을 갱신한다.
+    # 배치마다 커밋하므로 한 번에 잠기는 행은 해당 배치의 변경 대상 행뿐이다.
+    stats = {'scanned': 0, 'updated': 0, 'batches': 0}
+    last_id = 0
+    while True:
+        rows = db.session.query(Post.id, Post.author_id, Post.author_name) \
+            .filter(Post.id > last_id) \
+            .order_by(Post.id) \
+            .limit(batch_size) \
+            .all()
+        db.session.rollback()  # 읽기 스냅샷을 오래 잡고 있지 않도록 바로 종료
+        if not rows:
+            break
+        last_id = rows[-1].id
+        stats['scanned'] += len(rows)
+        stats['batches'] += 1
+
+        names = directory.lookup(row.author_id for row in rows)
+        stale = defaultdict(list)
+        for row in rows:
+            username = names.get(row.author_id)
+            if username is None:
+                username = deleted_name
+            if username and username != row.author_name:
+                stale[(row.author_id, username)].append(row.id)
+
+        changed_ids = [post_id for post_ids in stale.values() for post_id in post_ids]
+        if changed_ids and not dry_run:
+            for (author_id, username), post_ids in stale.items():
+                Post.query \
+                    .filter(Post.id.in_(post_ids), Post.author_id == author_id) \
+                    .update({Post.author_name: username}, synchronize_session=False)
+            db.session.commit()
+        stats['updated'] += len(changed_ids)
+
+        if on_batch:
+            on_batch(changed_ids)
+        if pause:
+            time.sleep(pause)
+    return stats
@@ -0,0 +1,82 @@
+from sqlalchemy import DateTime, text
+
+
+def list_columns(excerpt_length):
+    return (
+        'p.id, p.title, p.author_id, p.author_name, p.file_id, p.file_name, p.created_at, '
+        f'SUBSTR(p.content, 1, {int(excerpt_length) + 1}) AS excerpt'
+    )
+
+
+class MySQLFulltextSearch:
+    # posts(title, content)의 FULLTEXT(ngram) 인덱스를 사용. 인덱스는 MySQL이 자동으로 유지한다.
+    needs_bulk_index = False
+
+    def ensure_index(self, session):
+        pass
+
+    def index_post(self, session, post):
+        pass
+
+    def index_rows(self, session, rows):
+        pass
+
+    def remove_post(self, session, post_id):
+        pass
+
+    def search(self, session, query, limit, offset, excerpt_length):
+        sql = text(
+            f'SELECT {list_columns(excerpt_length)}, '
+            'MATCH(p.title, p.content) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score '
+            'FROM posts p '
+            'WHERE MATCH(p.title, p.content) AGAINST (:q IN NATURAL LANGUAGE MODE) '
+            'ORDER BY score DESC, p.id DESC '
+            'LIMIT :limit OFFSET :offset'
+        ).columns(created_at=DateTime)
+        return session.execute(sql, {'q': query, 'limit': limit, 'offset': offset}).all()
+
+
+class SQLiteFTSSearch:
+    # 로컬/테스트용: FTS5 가상 테이블을 게시글 작성/삭제 시 직접 갱신
+    needs_bulk_index = True
+
+    def ensure_index(self, session):
+        session.execute(text(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(title, content)'
+        ))
+        session.commit()
+
+    def index_post(self, session, post):
+        session.execute(
+            text('INSERT INTO posts_fts(rowid, title, content) VALUES (:id, :title, :content)'),
+            {'id': post.id, 'title': post.title, 'content': post.content}
+        )
+
+    def index_rows(self, session, rows):
+        # 일괄 가져오기: (id, title, content) 행을 한 번의 executemany로 색인
+        if rows:
+            session.execute(
+                text('INSERT INTO posts_fts(rowid, title, content) VALUES (:id, :title, :content)'),
+                [{'id': row.id, 'title': row.title, 'content': row.content} for row in rows]
+            )
+
+    def remove_post(self, session, post_id):
+        session.execute(text('DELETE FROM posts_fts WHERE rowid = :id'), {'id': post_id})
+
+    def search(self, session, query, limit, offset, excerpt_length):
+        # 사용자 입력을 FTS 문법으로 해석하지 않도록 단어마다 따옴표로 감싼다
+        match = ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+        sql = text(
+            f'SELECT {list_columns(excerpt_length)}, -bm25(posts_fts) AS score '
+            'FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid '
+            'WHERE posts_fts MATCH :match '
+            'ORDER BY score DESC, p.id DESC '
+            'LIMIT :limit OFFSET :offset'
+        ).columns(created_at=DateTime)
+        return session.execute(sql, {'match': match, 'limit': limit, 'offset': offset}).all()
+
+
+def create_search_backend(dialect_name):
+    if dialect_name == 'sqlite':
+        return SQLiteFTSSearch()
+    return MySQLFulltextSearch()
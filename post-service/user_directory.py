@@ -0,0 +1,55 @@
+from cache import TTLCache
+
+MISSING = object()
+
+
+class UserDirectoryUnavailable(Exception):
+    pass
+
+
+class UserDirectory:
+    # user-service /internal/users/batch 클라이언트: ID → 사용자 이름 (탈퇴한 사용자는 None)
+    def __init__(self, user_service, batch_size=100, cache_ttl=300, cache_size=10000,
+                 internal_token=None):
+        self.user_service = user_service
+        self.batch_size = batch_size
+        self.internal_token = internal_token
+        self._cache = TTLCache(ttl=cache_ttl, maxsize=cache_size)
+
+    def lookup(self, user_ids):
+        result = {}
+        misses = []
+        for user_id in sorted(set(user_ids)):
+            username = self._cache.get(user_id, MISSING)
+            if username is MISSING:
+                misses.append(user_id)
+            else:
+                result[user_id] = username
+
+        for start in range(0, len(misses), self.batch_size):
+            fetched = self._fetch(misses[start:start + self.batch_size])
+            for user_id, username in fetched.items():
+                self._cache.set(user_id, username)
+            result.update(fetched)
+        return result
+
+    def invalidate(self, user_id=None):
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.delete(int(user_id))
+
+    def _fetch(self, user_ids):
+        headers = {'X-Internal-Token': self.internal_token} if self.internal_token else {}
+        try:
+            response = self.user_service.post('/internal/users/batch', json={'ids': user_ids}, headers=headers)
+        except Exception as e:
+            raise UserDirectoryUnavailable(str(e))
+        if response.status_code != 200:
+            raise UserDirectoryUnavailable(f'user-service returned {response.status_code}')
+
+        data = response.json()
+        fetched = {user['id']: user['username'] for user in data.get('users', [])}
+        for user_id in data.get('missing', []):
+            fetched[user_id] = None
+        return fetched
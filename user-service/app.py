@@ -1,17 +1,75 @@
 from flask import Flask, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
 import os
 from models import db, User
 from config import Config
+from auth_hooks import register_invalidation_hook, http_invalidation_hook
+from hashing import PasswordHasher, HashingBusy
+from rate_limit import create_limiter
+from db_routing import ReplicaRouter, read_from_replica, on_replica
+import metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 db.init_app(app)
+metrics.init_app(app, 'user-service')
+metrics.instrument_sqlalchemy()
 jwt = JWTManager(app)
 
+# 다른 서비스는 토큰을 로컬에서 검증하므로, 사용자 변경 시 캐시 무효화를 알린다
+if app.config['AUTH_INVALIDATION_URLS']:
+    register_invalidation_hook(http_invalidation_hook(
+        app.config['AUTH_INVALIDATION_URLS'],
+        internal_token=app.config['INTERNAL_API_TOKEN']
+    ))
+
+replica_router = ReplicaRouter(
+    app,
+    replica_urls=app.config['DATABASE_REPLICA_URLS'],
+    engine_options=app.config['SQLALCHEMY_ENGINE_OPTIONS'],
+    consistency_window=app.config['DB_READ_CONSISTENCY_WINDOW']
+)
+
+password_hasher = PasswordHasher(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    max_workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT']
+)
+
+login_limiter_by_username = create_limiter(
+    app.config, 'login:username', app.config['LOGIN_RATE_PER_USERNAME'], app.config['LOGIN_BURST_PER_USERNAME']
+)
+login_limiter_by_ip = create_limiter(
+    app.config, 'login:ip', app.config['LOGIN_RATE_PER_IP'], app.config['LOGIN_BURST_PER_IP']
+)
+register_limiter_by_ip = create_limiter(
+    app.config, 'register:ip', app.config['REGISTER_RATE_PER_IP'], app.config['REGISTER_BURST_PER_IP']
+)
+
+def client_ip():
+    # nginx가 X-Real-IP를 덮어쓰고, frontend는 받은 값을 그대로 전달한다
+    return request.headers.get('X-Real-IP') or request.remote_addr
+
+def is_internal_request():
+    # 토큰이 없으면 거부한다. 토큰 없는 개발 환경은 INTERNAL_API_INSECURE로 명시적으로 허용
+    expected = app.config['INTERNAL_API_TOKEN']
+    if not expected:
+        return app.config['INTERNAL_API_INSECURE']
+    return request.headers.get('X-Internal-Token') == expected
+
+def too_many_requests(retry_after, message='로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요.'):
+    response = jsonify({'error': message})
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response, 429
+
+def hashing_busy():
+    response = jsonify({'error': '요청이 많아 잠시 후 다시 시도해주세요.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 def create_tables():
     db.create_all()
 
@@ -22,15 +80,22 @@ def register():
         username = data.get('username')
         password = data.get('password')
         
+        allowed, retry_after = register_limiter_by_ip.allow(client_ip())
+        if not allowed:
+            return too_many_requests(retry_after, '회원가입 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.')
+        
         if User.query.filter_by(username=username).first():
             return jsonify({'error': '이미 존재하는 사용자입니다!'}), 400
         
-        hashed_password = generate_password_hash(password)
+        hashed_password = password_hasher.hash(password)
         user = User(username=username, password=hashed_password)
         db.session.add(user)
         db.session.commit()
+        # 방금 가입한 사용자를 레플리카에서 못 찾으면 /verify가 primary에서 다시 확인한다
         
         return jsonify({'message': '회원가입이 완료되었습니다'}), 201
+    except HashingBusy:
+        return hashing_busy()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -41,10 +106,26 @@ def login():
         username = data.get('username')
         password = data.get('password')
         
+        # 해시 계산 전에 IP/사용자 이름별 시도 횟수를 먼저 제한
+        for limiter, key in ((login_limiter_by_ip, client_ip()), (login_limiter_by_username, username)):
+            allowed, retry_after = limiter.allow(key)
+            if not allowed:
+                return too_many_requests(retry_after)
+        
         user = User.query.filter_by(username=username).first()
         
-        if user and check_password_hash(user.password, password):
-            access_token = create_access_token(identity=str(user.id))
+        if user and password_hasher.verify(user.password, password):
+            if password_hasher.needs_rehash(user.password):
+                # 해시 설정이 바뀐 경우 로그인 성공 시점에 새 설정으로 다시 저장
+                try:
+                    user.password = password_hasher.hash(password)
+                    db.session.commit()
+                except HashingBusy:
+                    db.session.rollback()
+            access_token = create_access_token(
+                identity=str(user.id),
+                additional_claims={'username': user.username}
+            )
             return jsonify({
                 'access_token': access_token,
                 'user_id': user.id,
@@ -52,18 +133,25 @@ def login():
             }), 200
         else:
             return jsonify({'error': '아이디 또는 비밀번호가 잘못되었습니다~~'}), 401
+    except HashingBusy:
+        return hashing_busy()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/verify', methods=['POST'])
 @jwt_required()
+@read_from_replica
 def verify_token():
     current_user_id = get_jwt_identity()
     try:
         user_id_int = int(current_user_id)
     except (TypeError, ValueError):
         return jsonify({'valid': False}), 401
-    user = User.query.get(user_id_int)
+    user = db.session.get(User, user_id_int)
+    if user is None and on_replica():
+        # 방금 가입한 사용자는 레플리카에 아직 없을 수 있음
+        with replica_router.primary():
+            user = db.session.get(User, user_id_int)
     if user:
         return jsonify({
             'valid': True,
@@ -72,6 +160,33 @@ def verify_token():
         }), 200
     return jsonify({'valid': False}), 401
 
+@app.route('/internal/users/batch', methods=['POST'])
+def get_users_batch():
+    try:
+        if not is_internal_request():
+            return jsonify({'error': '허용되지 않은 요청입니다'}), 403
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            user_ids = sorted({int(user_id) for user_id in data.get('ids', [])})
+        except (TypeError, ValueError):
+            return jsonify({'error': '잘못된 사용자 ID입니다'}), 400
+        if len(user_ids) > app.config['USERS_BATCH_MAX']:
+            return jsonify({'error': f"한 번에 최대 {app.config['USERS_BATCH_MAX']}명까지 조회할 수 있습니다"}), 400
+        
+        # PK 인덱스를 타는 IN 쿼리 한 번으로 조회
+        rows = []
+        if user_ids:
+            rows = db.session.query(User.id, User.username).filter(User.id.in_(user_ids)).all()
+        found = {row.id for row in rows}
+        
+        return jsonify({
+            'users': [{'id': row.id, 'username': row.username} for row in rows],
+            'missing': [user_id for user_id in user_ids if user_id not in found]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy'}), 200
@@ -0,0 +1,29 @@
+import requests
+
+_hooks = []
+
+
+def register_invalidation_hook(hook):
+    # hook(user_id): 사용자 정보가 바뀌거나 삭제되었을 때 호출됨
+    _hooks.append(hook)
+    return hook
+
+
+def notify_user_invalidated(user_id, logger=None):
+    for hook in list(_hooks):
+        try:
+            hook(user_id)
+        except Exception as e:
+            if logger:
+                logger.warning(f"사용자 캐시 무효화 훅 실패: {e}")
+
+
+def http_invalidation_hook(urls, internal_token=None, timeout=2):
+    # 각 서비스의 /internal/auth/invalidate 엔드포인트로 무효화 요청 전달
+    headers = {'X-Internal-Token': internal_token} if internal_token else {}
+
+    def hook(user_id):
+        for url in urls:
+            requests.post(url, json={'user_id': user_id}, headers=headers, timeout=timeout)
+
+    return hook
@@ -0,0 +1,90 @@
+# gunicorn이 작업 디렉터리의 gunicorn.conf.py를 자동으로 읽는다
+# 기본값은 아래 역할별 프로필이며 GUNICORN_* 환경 변수(또는 명령줄 옵션)로 덮어쓸 수 있다.
+#
+# user-service: 비밀번호 해시는 워커별 프로세스 풀(hashing.py)에서 계산하고 요청 스레드는 결과를 기다리기만 한다.
+# 그래서 gthread 워커로 여러 요청을 받아, 로그인이 해시를 기다리는 동안에도 /verify 등 가벼운 요청을 처리한다.
+# 해시 대기 수(PASSWORD_HASH_MAX_PENDING)는 기본값이 스레드 수의 절반이라 나머지 스레드는 항상 다른 요청에 남는다.
+import os
+import shutil
+import subprocess
+import sys
+
+
+def cpu_count():
+    # 컨테이너 CPU 제한(cgroup v2 cpu.max)이 있으면 그 값을, 없으면 사용 가능한 CPU 수를 쓴다
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', max(2, cpu_count())))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# nginx upstream keepalive(기본 60초)보다 길게 유지해 재사용 중 끊기는 경합을 피한다 (sync 워커는 무시)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 65))
+
+# 마스터에서 앱을 한 번 import하고 fork: 워커끼리 코드/모듈 메모리를 copy-on-write로 공유하고 기동이 빨라진다
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# 요청 수가 쌓이면 워커를 교체해 메모리 증가(단편화, 누수)를 되돌린다. jitter로 동시에 재시작되지 않게 분산
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+wsgi_app = 'app:app'
+
+
+CREATE_TABLES = (
+    'from app import app, create_tables\n'
+    'with app.app_context():\n'
+    '    create_tables()\n'
+)
+
+
+def on_starting(server):
+    # 이전 실행에서 남은 워커별 메트릭 파일 정리
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    # gunicorn은 app.py의 __main__ 블록을 실행하지 않으므로 워커를 띄우기 전에 테이블을 한 번 만든다.
+    # preload가 꺼져 있으면 마스터가 앱을 import하지 않도록 별도 프로세스에서 실행
+    if server.cfg.preload_app:
+        from app import app, create_tables
+        with app.app_context():
+            create_tables()
+    else:
+        subprocess.run([sys.executable, '-c', CREATE_TABLES], check=True)
+
+
+def post_fork(server, worker):
+    # preload로 마스터에서 만든 커넥션/풀을 워커가 그대로 쓰지 않도록 정리 (다음 사용 시 워커에서 새로 생성)
+    if not server.cfg.preload_app:
+        return
+    from app import app, db, password_hasher, replica_router
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    replica_router.dispose(close=False)
+    password_hasher.shutdown()
+
+
+def post_worker_init(worker):
+    worker.log.info('Worker ready (pid: %s)', worker.pid)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
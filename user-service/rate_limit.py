@@ -0,0 +1,97 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    # 키(사용자 이름, IP 등)별 토큰 버킷. 초당 rate개씩 채워지고 최대 burst개까지 쌓인다.
+    # 버킷은 최근 사용 순으로 maxsize개만 유지한다.
+    def __init__(self, rate, burst, maxsize=100000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        # (허용 여부, 다음 토큰까지 남은 초)를 반환
+        if self.rate <= 0:
+            return True, 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after == 0, retry_after
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class RedisTokenBucketLimiter:
+    # 워커/레플리카가 공유하는 토큰 버킷. 갱신은 Lua 스크립트 하나로 원자적으로 처리하고
+    # 시각은 Redis 서버 시계(TIME)를 써서 프로세스마다 시계가 달라도 같은 버킷을 본다.
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(retry_after)
+"""
+
+    def __init__(self, client, name, rate, burst):
+        self.client = client
+        self.prefix = f'ratelimit:{name}:'
+        self.rate = rate
+        self.burst = burst
+        # 빈 버킷이 다시 가득 차는 시간이 지나면 키를 지워도 결과가 같다
+        self.ttl = max(1, math.ceil(burst / rate)) + 1 if rate > 0 else 1
+        self._script = client.register_script(self.SCRIPT)
+
+    def allow(self, key):
+        # (허용 여부, 다음 토큰까지 남은 초)를 반환. Redis 장애 시에는 로그인을 막지 않는다
+        if self.rate <= 0:
+            return True, 0
+        try:
+            retry_after = float(self._script(keys=[self.prefix + str(key)], args=[self.rate, self.burst, self.ttl]))
+        except Exception:
+            logging.getLogger(__name__).warning('rate limit check failed, allowing request', exc_info=True)
+            return True, 0
+        return retry_after == 0, retry_after
+
+    def reset(self, key):
+        self.client.delete(self.prefix + str(key))
+
+
+def create_limiter(config, name, per_minute, burst):
+    # local: 워커(프로세스)마다 따로 센다 → 실제 한도는 워커 수만큼 커지고 재시작하면 초기화된다
+    # redis: 모든 워커/레플리카가 같은 버킷을 쓴다
+    rate = per_minute / 60.0
+    if config['RATE_LIMIT_BACKEND'] == 'redis':
+        import redis
+        return RedisTokenBucketLimiter(redis.Redis.from_url(config['RATE_LIMIT_REDIS_URL']), name, rate, burst)
+    return TokenBucketLimiter(rate=rate, burst=burst)